@@ -0,0 +1,30 @@
+"""index active sessions for the revocation filter
+
+Revision ID: 0003_active_sessions
+Revises: 0002_media
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003_active_sessions"
+down_revision = "0002_media"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_active_sessions_user_id", "active_sessions", ["user_id"])
+    op.create_index(
+        "ix_active_sessions_revoked_at",
+        "active_sessions",
+        ["revoked_at"],
+        postgresql_where=sa.text("revoked"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_active_sessions_revoked_at", table_name="active_sessions")
+    op.drop_index("ix_active_sessions_user_id", table_name="active_sessions")
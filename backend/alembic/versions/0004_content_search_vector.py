@@ -0,0 +1,35 @@
+"""full-text search vector for contents
+
+Revision ID: 0004_content_search
+Revises: 0003_active_sessions
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0004_content_search"
+down_revision = "0003_active_sessions"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(slug, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('simple', regexp_replace(coalesce(body, ''), '<[^>]+>', ' ', 'g')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "contents",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True)),
+    )
+    op.create_index("ix_contents_search_vector", "contents", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contents_search_vector", table_name="contents")
+    op.drop_column("contents", "search_vector")
@@ -0,0 +1,26 @@
+"""composite indexes for keyset pagination
+
+Revision ID: 0005_keyset_indexes
+Revises: 0004_content_search
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0005_keyset_indexes"
+down_revision = "0004_content_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_contents_created_at_id", "contents", ["created_at", "id"])
+    op.create_index("ix_audit_logs_created_at_id", "audit_logs", ["created_at", "id"])
+    op.create_index("ix_media_files_created_at_id", "media_files", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_media_files_created_at_id", table_name="media_files")
+    op.drop_index("ix_audit_logs_created_at_id", table_name="audit_logs")
+    op.drop_index("ix_contents_created_at_id", table_name="contents")
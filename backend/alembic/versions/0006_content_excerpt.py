@@ -0,0 +1,33 @@
+"""precomputed content excerpts
+
+Revision ID: 0006_content_excerpt
+Revises: 0005_keyset_indexes
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006_content_excerpt"
+down_revision = "0005_keyset_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("contents", sa.Column("excerpt", sa.String(length=300)))
+    # 既有資料以 SQL 近似回填（去除標籤、壓縮空白）；之後的寫入由應用程式計算
+    op.execute(
+        """
+        UPDATE contents
+        SET excerpt = NULLIF(
+            left(btrim(regexp_replace(regexp_replace(body, '<[^>]+>', ' ', 'g'), '\\s+', ' ', 'g')), 200),
+            ''
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("contents", "excerpt")
@@ -0,0 +1,105 @@
+"""monthly range partitions for audit_logs
+
+Revision ID: 0007_audit_partitions
+Revises: 0006_content_excerpt
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007_audit_partitions"
+down_revision = "0006_content_excerpt"
+branch_labels = None
+depends_on = None
+
+# 之後的月份由 app/services/audit_partitions.py 定期補建；分割命名 audit_logs_pYYYYMM 需與其一致
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, user_id, action, target_id, device_info, ip_address, meta, created_at"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partition(month: date) -> None:
+    op.execute(
+        f"CREATE TABLE audit_logs_p{month:%Y%m} PARTITION OF audit_logs "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def upgrade() -> None:
+    # 舊表改名保留資料；索引與主鍵名稱讓給新的分割表
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+    op.execute("ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_audit_logs_created_at_id")
+    op.execute("DROP INDEX IF EXISTS ix_audit_logs_id")
+
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id integer NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id uuid REFERENCES users (id) ON DELETE SET NULL,
+            action varchar(100) NOT NULL,
+            target_id varchar(100),
+            device_info text,
+            ip_address varchar(45),
+            meta text,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.create_index("ix_audit_logs_created_at_id", "audit_logs", ["created_at", "id"])
+
+    now = datetime.now(tz=timezone.utc)
+    current = date(now.year, now.month, 1)
+    oldest = op.get_bind().execute(sa.text("SELECT min(created_at) FROM audit_logs_legacy")).scalar()
+    month = date(oldest.year, oldest.month, 1) if oldest else current
+    month = min(month, current)
+    while month <= _add_months(current, MONTHS_AHEAD):
+        _create_partition(month)
+        month = _add_months(month, 1)
+    # 範圍外的資料（例如時鐘錯誤的未來時間）落入 default，避免寫入失敗
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    op.execute(
+        f"INSERT INTO audit_logs ({COLUMNS}) "
+        f"SELECT id, user_id, action, target_id, device_info, ip_address, meta, coalesce(created_at, now()) "
+        f"FROM audit_logs_legacy"
+    )
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("DROP TABLE audit_logs_legacy")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_audit_logs_created_at_id")
+    op.execute("DROP INDEX IF EXISTS ix_audit_logs_id")
+
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id integer PRIMARY KEY DEFAULT nextval('audit_logs_id_seq'),
+            user_id uuid REFERENCES users (id) ON DELETE SET NULL,
+            action varchar(100) NOT NULL,
+            target_id varchar(100),
+            device_info text,
+            ip_address varchar(45),
+            meta text,
+            created_at timestamptz DEFAULT now()
+        )
+        """
+    )
+    op.create_index("ix_audit_logs_created_at_id", "audit_logs", ["created_at", "id"])
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    # 連同所有分割（含 default）一起刪除
+    op.execute("DROP TABLE audit_logs_partitioned")
@@ -0,0 +1,37 @@
+"""audit_logs.meta as JSONB with filter indexes
+
+Revision ID: 0008_audit_meta_jsonb
+Revises: 0007_audit_partitions
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0008_audit_meta_jsonb"
+down_revision = "0007_audit_partitions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 既有資料皆由 json.dumps 寫入，可直接轉型
+    op.execute("ALTER TABLE audit_logs ALTER COLUMN meta TYPE jsonb USING meta::jsonb")
+    op.create_index(
+        "ix_audit_logs_meta",
+        "audit_logs",
+        ["meta"],
+        postgresql_using="gin",
+        postgresql_ops={"meta": "jsonb_path_ops"},
+    )
+    op.create_index("ix_audit_logs_user_id_created_at", "audit_logs", ["user_id", "created_at"])
+    op.create_index("ix_audit_logs_action_created_at", "audit_logs", ["action", "created_at"])
+    op.create_index("ix_audit_logs_target_id_created_at", "audit_logs", ["target_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_logs_target_id_created_at", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_action_created_at", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_user_id_created_at", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_meta", table_name="audit_logs")
+    op.execute("ALTER TABLE audit_logs ALTER COLUMN meta TYPE text USING meta::text")
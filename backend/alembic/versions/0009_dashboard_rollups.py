@@ -0,0 +1,52 @@
+"""dashboard rollup tables
+
+Revision ID: 0009_dashboard_rollups
+Revises: 0008_audit_meta_jsonb
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_dashboard_rollups"
+down_revision = "0008_audit_meta_jsonb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_daily_counts",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("action", sa.String(length=100), primary_key=True),
+        sa.Column("count", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "dashboard_counters",
+        sa.Column("name", sa.String(length=50), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    # 一次性回填歷史資料，之後由背景工作只重算最近兩天
+    op.execute(
+        """
+        INSERT INTO audit_daily_counts (day, action, count)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, action, count(*)
+        FROM audit_logs
+        GROUP BY 1, 2
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO dashboard_counters (name, value)
+        VALUES
+            ('members', (SELECT count(*) FROM users)),
+            ('contents', (SELECT count(*) FROM contents WHERE NOT is_deleted))
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("dashboard_counters")
+    op.drop_table("audit_daily_counts")
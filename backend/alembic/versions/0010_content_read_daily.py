@@ -0,0 +1,32 @@
+"""content read analytics rollup
+
+Revision ID: 0010_content_read_daily
+Revises: 0009_dashboard_rollups
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010_content_read_daily"
+down_revision = "0009_dashboard_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_read_daily",
+        sa.Column("content_id", sa.Integer(), sa.ForeignKey("contents.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("views", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("unique_readers", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("readers", sa.LargeBinary(), nullable=False),
+    )
+    op.create_index("ix_content_read_daily_day", "content_read_daily", ["day"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_content_read_daily_day", table_name="content_read_daily")
+    op.drop_table("content_read_daily")
@@ -0,0 +1,26 @@
+"""content hash for deduplicated media storage
+
+Revision ID: 0011_media_content_hash
+Revises: 0010_content_read_daily
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0011_media_content_hash"
+down_revision = "0010_content_read_daily"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 既有檔案的雜湊由 app/scripts/backfill_media_hashes.py 回填
+    op.add_column("media_files", sa.Column("content_hash", sa.String(length=64)))
+    op.create_unique_constraint("media_files_content_hash_key", "media_files", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("media_files_content_hash_key", "media_files", type_="unique")
+    op.drop_column("media_files", "content_hash")
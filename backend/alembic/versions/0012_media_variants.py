@@ -0,0 +1,30 @@
+"""image dimensions, LQIP and derivatives on media_files
+
+Revision ID: 0012_media_variants
+Revises: 0011_media_content_hash
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0012_media_variants"
+down_revision = "0011_media_content_hash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("media_files", sa.Column("width", sa.Integer()))
+    op.add_column("media_files", sa.Column("height", sa.Integer()))
+    op.add_column("media_files", sa.Column("lqip", sa.Text()))
+    op.add_column("media_files", sa.Column("variants", postgresql.JSONB()))
+
+
+def downgrade() -> None:
+    op.drop_column("media_files", "variants")
+    op.drop_column("media_files", "lqip")
+    op.drop_column("media_files", "height")
+    op.drop_column("media_files", "width")
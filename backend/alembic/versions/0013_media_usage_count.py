@@ -0,0 +1,34 @@
+"""denormalized usage_count on media_files
+
+Revision ID: 0013_media_usage_count
+Revises: 0012_media_variants
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0013_media_usage_count"
+down_revision = "0012_media_variants"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("media_files", sa.Column("usage_count", sa.Integer(), nullable=False, server_default="0"))
+    op.execute(
+        """
+        UPDATE media_files
+        SET usage_count = usage.count
+        FROM (SELECT media_id, count(*) AS count FROM content_media GROUP BY media_id) AS usage
+        WHERE media_files.id = usage.media_id
+        """
+    )
+    # 依引用次數篩選（例如找出未使用的媒體）時使用
+    op.create_index("ix_media_files_usage_count", "media_files", ["usage_count"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_media_files_usage_count", table_name="media_files")
+    op.drop_column("media_files", "usage_count")
@@ -0,0 +1,34 @@
+"""trigram indexes for CJK substring search on contents
+
+Revision ID: 0014_content_trigram
+Revises: 0013_media_usage_count
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0014_content_trigram"
+down_revision = "0013_media_usage_count"
+branch_labels = None
+depends_on = None
+
+TRIGRAM_COLUMNS = ("title", "slug", "tags")
+
+
+def upgrade() -> None:
+    # 'simple' tsvector 會把連續的中文字串當成單一詞彙，中文查詢改以 ILIKE 子字串比對，由 trigram 索引支援
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"ix_contents_{column}_trgm",
+            "contents",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for column in TRIGRAM_COLUMNS:
+        op.drop_index(f"ix_contents_{column}_trgm", table_name="contents")
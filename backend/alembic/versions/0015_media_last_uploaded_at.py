@@ -0,0 +1,28 @@
+"""last_uploaded_at on media_files for the media GC grace period
+
+Revision ID: 0015_media_last_uploaded_at
+Revises: 0014_content_trigram
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0015_media_last_uploaded_at"
+down_revision = "0014_content_trigram"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 重複上傳（內容雜湊相同）時更新此欄，GC 的寬限期改以它計算
+    op.add_column("media_files", sa.Column("last_uploaded_at", sa.DateTime(timezone=True)))
+    op.execute("UPDATE media_files SET last_uploaded_at = created_at")
+    op.alter_column("media_files", "last_uploaded_at", nullable=False, server_default=sa.func.now())
+    op.create_index("ix_media_files_last_uploaded_at_id", "media_files", ["last_uploaded_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_media_files_last_uploaded_at_id", table_name="media_files")
+    op.drop_column("media_files", "last_uploaded_at")
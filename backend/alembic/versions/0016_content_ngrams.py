@@ -0,0 +1,57 @@
+"""CJK unigram/bigram index for short substring searches on contents
+
+Revision ID: 0016_content_ngrams
+Revises: 0015_media_last_uploaded_at
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0016_content_ngrams"
+down_revision = "0015_media_last_uploaded_at"
+branch_labels = None
+depends_on = None
+
+CJK_CLASS = r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+CONTENT_NGRAMS_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION content_ngrams(value text) RETURNS text[]
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT coalesce(array_agg(DISTINCT gram), '{{}}')
+    FROM (
+        SELECT substr(lower(value), i, n) AS gram, n
+        FROM generate_series(1, char_length(value)) AS i, (VALUES (1), (2)) AS sizes(n)
+    ) AS grams
+    WHERE char_length(gram) = n AND gram !~ '\\s' AND gram ~ '{CJK_CLASS}'
+$$
+"""
+SEARCH_NGRAMS_SQL = "content_ngrams(coalesce(title, '') || ' ' || coalesce(slug, '') || ' ' || coalesce(tags, ''))"
+TRIGRAM_COLUMNS = ("title", "slug", "tags")
+
+
+def upgrade() -> None:
+    # pg_trgm 無法以索引處理少於 3 個字的 ILIKE，而中文查詢多為 1~2 個字：改用 CJK 單字/雙字 n-gram 索引
+    for column in TRIGRAM_COLUMNS:
+        op.drop_index(f"ix_contents_{column}_trgm", table_name="contents")
+    op.execute(CONTENT_NGRAMS_FUNCTION_SQL)
+    op.add_column(
+        "contents",
+        sa.Column("search_ngrams", postgresql.ARRAY(sa.Text()), sa.Computed(SEARCH_NGRAMS_SQL, persisted=True)),
+    )
+    op.create_index("ix_contents_search_ngrams", "contents", ["search_ngrams"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contents_search_ngrams", table_name="contents")
+    op.drop_column("contents", "search_ngrams")
+    op.execute("DROP FUNCTION IF EXISTS content_ngrams(text)")
+    for column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"ix_contents_{column}_trgm",
+            "contents",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
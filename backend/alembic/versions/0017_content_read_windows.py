@@ -0,0 +1,47 @@
+"""pre-merged read analytics windows
+
+Revision ID: 0017_content_read_windows
+Revises: 0016_content_ngrams
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0017_content_read_windows"
+down_revision = "0016_content_ngrams"
+branch_labels = None
+depends_on = None
+
+WINDOWS = (7, 30, 90, 365)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_read_windows",
+        sa.Column("content_id", sa.Integer(), sa.ForeignKey("contents.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("window_days", sa.SmallInteger(), primary_key=True),
+        sa.Column("start_day", sa.Date(), nullable=False),
+        sa.Column("views", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("unique_readers", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("readers", sa.LargeBinary(), nullable=False),
+    )
+    op.create_index("ix_content_read_windows_views", "content_read_windows", ["window_days", "views"])
+    op.create_index("ix_content_read_windows_start_day", "content_read_windows", ["window_days", "start_day"])
+    # 先放入起日過時的空白列，由背景工作自 content_read_daily 逐批重算（合併草圖需在應用端進行）
+    for window in WINDOWS:
+        op.execute(
+            f"""
+            INSERT INTO content_read_windows (content_id, window_days, start_day, views, unique_readers, readers)
+            SELECT DISTINCT content_id, {window}, DATE '1970-01-01', 0, 0, decode(repeat('00', 4096), 'hex')
+            FROM content_read_daily
+            WHERE day > (now() AT TIME ZONE 'UTC')::date - {window}
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_content_read_windows_start_day", table_name="content_read_windows")
+    op.drop_index("ix_content_read_windows_views", table_name="content_read_windows")
+    op.drop_table("content_read_windows")
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -10,13 +11,55 @@ class Settings(BaseSettings):
     app_env: str = "development"
     secret_key: str = "change_me"
     database_url: str = "postgresql+psycopg2://admin:password@db:5432/content_db"
+    async_database_url: str | None = None
     jwt_expire_minutes: int = 60 * 24
     rate_limit_window: int = 300
     rate_limit_max: int = 5
+    rate_limit_storage_uri: str = "bounded-memory://"
+    rate_limit_strategy: str = "sliding-window-counter"
     algorithm: str = "HS256"
     api_prefix: str = "/api"
     upload_dir: str = "uploads"
+    upload_max_bytes: int = 500 * 1024
+    upload_chunk_size: int = 64 * 1024
+    image_workers: int = 1
+    # 產生衍生檔的像素上限（寬 × 高）；超過時不解碼，該媒體一律使用原檔
+    image_max_pixels: int = 40_000_000
+    # /uploads 的快取時間（檔名不重複使用，可視為永久）；設定前綴時改由 nginx 以 X-Accel-Redirect 傳送檔案
+    media_cache_max_age: int = 365 * 24 * 3600
+    media_accel_redirect_prefix: str = ""
+    # 孤兒媒體回收：沒有內容引用且超過寬限期的媒體分批刪除
+    media_gc_enabled: bool = True
+    media_gc_interval_seconds: int = 6 * 3600
+    media_gc_grace_hours: float = 72
+    media_gc_batch_size: int = 100
+    media_gc_max_deletes_per_run: int = 1000
+    media_gc_batch_pause_seconds: float = 0.5
+    media_gc_verify_storage: bool = True
     allowed_origins: str = "*"
+    principal_cache_ttl_seconds: int = 30
+    principal_cache_max_size: int = 10_000
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 16
+    session_revocation_refresh_seconds: int = 5
+    jwt_decode_cache_max_size: int = 10_000
+    public_content_cache_seconds: int = 30
+    public_content_detail_cache_size: int = 256
+    audit_queue_max_size: int = 10_000
+    # 單一 INSERT 的參數上限為 32767，超過 MAX_ROWS_PER_INSERT（約 4.6k 列）時會被截到上限
+    audit_batch_size: int = 500
+    audit_flush_interval_seconds: float = 1.0
+    audit_flush_max_retries: int = 5
+    audit_flush_retry_seconds: float = 0.5
+    audit_track_batch_max_events: int = 500
+    audit_track_batch_max_bytes: int = 1024 * 1024
+    audit_partition_months_ahead: int = 3
+    audit_retention_months: int = 12
+    audit_retention_mode: Literal["detach", "drop"] = "detach"
+    audit_partition_maintenance_seconds: int = 3600
+    read_analytics_flush_seconds: int = 30
+    read_analytics_roll_batch_size: int = 200
 
     @field_validator("secret_key")
     @classmethod
@@ -57,3 +100,15 @@ def get_settings() -> Settings:
 
 def get_database_url() -> str:
     return get_settings().database_url
+
+
+def get_async_database_url() -> str:
+    """未指定 ASYNC_DATABASE_URL 時，沿用 DATABASE_URL 並改用 asyncpg driver"""
+    settings = get_settings()
+    if settings.async_database_url:
+        return settings.async_database_url
+    url = settings.database_url
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
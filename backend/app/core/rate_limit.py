@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from math import floor
+from urllib.parse import parse_qs, urlparse
+
+from limits.storage import SlidingWindowCounterSupport, Storage
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.core.config import get_settings
+
+
+class _Shard:
+    __slots__ = ("lock", "entries")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # key -> [視窗長度, 視窗序號, 前一視窗計數, 目前視窗計數]
+        self.entries: OrderedDict[str, list[int]] = OrderedDict()
+
+
+class BoundedMemoryStorage(Storage, SlidingWindowCounterSupport):
+    """單一 worker 內的限流儲存：每個 key 只保留前後兩個視窗的計數（O(1) 記憶體），
+    總 key 數有上限並以 LRU 淘汰，鎖依 key 分散到多個 shard 以避免單一熱點。
+
+    URI 範例：``bounded-memory://?max_keys=100000&shards=64``
+    """
+
+    STORAGE_SCHEME = ["bounded-memory"]
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **options: float | str | bool):
+        query = parse_qs(urlparse(uri).query) if uri else {}
+        max_keys = int(options.get("max_keys") or query.get("max_keys", ["100000"])[0])
+        shard_count = int(options.get("shards") or query.get("shards", ["64"])[0])
+        self._shards = [_Shard() for _ in range(shard_count)]
+        self._max_keys_per_shard = max(1, max_keys // shard_count)
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+
+    @property
+    def base_exceptions(self) -> type[Exception] | tuple[type[Exception], ...]:
+        return ValueError
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    def _roll(self, shard: _Shard, key: str, expiry: int, now: float) -> list[int]:
+        window = int(now // expiry)
+        entry = shard.entries.get(key)
+        if entry is None:
+            entry = [expiry, window, 0, 0]
+            shard.entries[key] = entry
+            if len(shard.entries) > self._max_keys_per_shard:
+                shard.entries.popitem(last=False)
+        else:
+            shard.entries.move_to_end(key)
+            if entry[1] != window:
+                entry[2] = entry[3] if entry[1] == window - 1 else 0
+                entry[3] = 0
+                entry[1] = window
+        return entry
+
+    # 固定視窗（fixed-window）策略：以 expiry 為視窗長度計數
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        shard = self._shard(key)
+        with shard.lock:
+            entry = self._roll(shard, key, expiry, time.time())
+            entry[3] += amount
+            return entry[3]
+
+    def get(self, key: str) -> int:
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                return 0
+            return self._roll(shard, key, entry[0], time.time())[3]
+
+    def get_expiry(self, key: str) -> float:
+        entry = self._shard(key).entries.get(key)
+        if entry is None:
+            return time.time()
+        return (entry[1] + 1) * entry[0]
+
+    def check(self) -> bool:
+        return True
+
+    def reset(self) -> int | None:
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += len(shard.entries)
+                shard.entries.clear()
+        return removed
+
+    def clear(self, key: str) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.entries.pop(key, None)
+
+    # 滑動視窗計數（sliding-window-counter）策略
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        shard = self._shard(key)
+        with shard.lock:
+            entry = self._roll(shard, key, expiry, now)
+            previous_ttl = expiry - (now % expiry)
+            weighted = entry[2] * previous_ttl / expiry + entry[3]
+            if floor(weighted) + amount > limit:
+                return False
+            entry[3] += amount
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        now = time.time()
+        shard = self._shard(key)
+        with shard.lock:
+            entry = self._roll(shard, key, expiry, now)
+            previous_count, current_count = entry[2], entry[3]
+        current_ttl = expiry - (now % expiry)
+        previous_ttl = current_ttl if previous_count else 0.0
+        return previous_count, previous_ttl, current_count, current_ttl + expiry
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.clear(key)
+
+
+def _build_limiter() -> Limiter:
+    settings = get_settings()
+    return Limiter(
+        key_func=get_remote_address,
+        default_limits=["100/minute"],
+        storage_uri=settings.rate_limit_storage_uri,
+        strategy=settings.rate_limit_strategy,
+    )
+
+
+# 全應用共用的速率限制器；多 worker 部署時將 RATE_LIMIT_STORAGE_URI 指向 redis:// 共用計數
+limiter = _build_limiter()
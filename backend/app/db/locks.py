@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import hashlib
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+def advisory_lock_key(name: str) -> int:
+    """以名稱換算 PostgreSQL advisory lock 的 bigint 代號；各 worker 與 process 結果一致（不可用 hash()）"""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+
+
+async def try_advisory_lock(conn: AsyncConnection, name: str) -> bool:
+    """連線層級的鎖，跨越多個交易，需以 advisory_unlock 釋放（連線關閉時也會釋放）"""
+    return bool(await conn.scalar(select(func.pg_try_advisory_lock(advisory_lock_key(name)))))
+
+
+async def advisory_unlock(conn: AsyncConnection, name: str) -> None:
+    await conn.scalar(select(func.pg_advisory_unlock(advisory_lock_key(name))))
+
+
+async def try_advisory_xact_lock(conn: AsyncConnection, name: str) -> bool:
+    """交易層級的鎖，commit 或 rollback 時自動釋放"""
+    return bool(await conn.scalar(select(func.pg_try_advisory_xact_lock(advisory_lock_key(name)))))
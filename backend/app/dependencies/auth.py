@@ -4,11 +4,13 @@ import uuid
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User, UserRole
+from app.services.principal_cache import principal_cache
+from app.services.sessions import revocation_filter
 from app.utils.security import decode_access_token
 
 http_bearer = HTTPBearer(auto_error=False)
@@ -16,7 +18,7 @@ http_bearer = HTTPBearer(auto_error=False)
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User:
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
@@ -30,15 +32,23 @@ async def get_current_user(
 
     user_id: str | None = payload.get("sub")
     token_version: int | None = payload.get("token_version")
-    if user_id is None or token_version is None:
+    jwt_id: str | None = payload.get("jti")
+    if user_id is None or token_version is None or jwt_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
+    if revocation_filter.is_revoked(jwt_id):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session revoked")
+
     try:
         user_uuid = uuid.UUID(user_id)
     except (ValueError, TypeError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid subject") from None
 
-    user = db.get(User, user_uuid)
+    user = principal_cache.get(user_uuid, token_version)
+    if user is None:
+        user = await db.get(User, user_uuid)
+        if user is not None:
+            principal_cache.put(user)
     if user is None or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
 
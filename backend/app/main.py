@@ -1,23 +1,42 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from pathlib import Path
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from slowapi import Limiter, _rate_limit_exceeded_handler
+from fastapi.responses import JSONResponse
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
 
 from app.core.config import get_settings
+from app.core.rate_limit import limiter
 from app.db.base import Base
-from app.db.session import engine
-from app.routers import audit, auth, categories, contents, dashboard, media, members, uploads
+from app.db.session import async_engine, engine
+from app.routers import analytics, audit, auth, categories, contents, dashboard, media, members, public, uploads
+from app.services.audit import audit_writer
+from app.services.audit_partitions import maintain_audit_partitions
+from app.services.images import image_pipeline
+from app.services.media_gc import collect_media_garbage
+from app.services.passwords import PasswordHasherBusy, password_hasher
+from app.services.read_analytics import flush_read_analytics
+from app.services.sessions import refresh_revocation_filter
+from app.services.storage import storage
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.static_media import MediaStaticFiles
+from app.utils.tasks import run_periodically
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
-# 初始化速率限制器
-limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
+
+def _password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
 
 
 def create_app() -> FastAPI:
@@ -26,6 +45,7 @@ def create_app() -> FastAPI:
     # 註冊速率限制器
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.add_exception_handler(PasswordHasherBusy, _password_hasher_busy_handler)
 
     # 配置 CORS：從環境變數讀取允許的來源（逗號分隔）
     origins = [origin.strip() for origin in settings.allowed_origins.split(",") if origin.strip()]
@@ -35,6 +55,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     app.include_router(auth.router)
@@ -45,15 +66,75 @@ def create_app() -> FastAPI:
     app.include_router(dashboard.router)
     app.include_router(media.router)
     app.include_router(uploads.router)
+    app.include_router(public.router)
+    app.include_router(analytics.router)
 
     upload_path = Path(settings.upload_dir)
     upload_path.mkdir(parents=True, exist_ok=True)
-    app.mount("/uploads", StaticFiles(directory=str(upload_path)), name="uploads")
+    app.mount(
+        "/uploads",
+        MediaStaticFiles(
+            directory=str(upload_path),
+            max_age=settings.media_cache_max_age,
+            accel_redirect_prefix=settings.media_accel_redirect_prefix,
+            legacy_key=storage.legacy_key,
+        ),
+        name="uploads",
+    )
 
     @app.on_event("startup")
     def _startup() -> None:
         if settings.app_env == "development":
             Base.metadata.create_all(bind=engine)
+        password_hasher.start()
+
+    @app.on_event("startup")
+    async def _start_background_tasks() -> None:
+        audit_writer.start()
+        app.state.background_tasks = [
+            asyncio.create_task(
+                run_periodically(
+                    settings.session_revocation_refresh_seconds,
+                    refresh_revocation_filter,
+                    name="revocation_filter",
+                )
+            ),
+            asyncio.create_task(
+                run_periodically(
+                    settings.audit_partition_maintenance_seconds,
+                    maintain_audit_partitions,
+                    name="audit_partitions",
+                )
+            ),
+            asyncio.create_task(
+                run_periodically(
+                    settings.read_analytics_flush_seconds,
+                    flush_read_analytics,
+                    name="read_analytics",
+                )
+            ),
+        ]
+        if settings.media_gc_enabled:
+            app.state.background_tasks.append(
+                asyncio.create_task(
+                    run_periodically(settings.media_gc_interval_seconds, collect_media_garbage, name="media_gc")
+                )
+            )
+
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:
+        for task in app.state.background_tasks:
+            task.cancel()
+        await asyncio.gather(*app.state.background_tasks, return_exceptions=True)
+        # 先把佇列中的稽核紀錄與尚未寫入的閱讀統計寫完再釋放連線池
+        await audit_writer.stop()
+        try:
+            await flush_read_analytics()
+        except Exception:
+            logger.exception("Failed to flush read analytics on shutdown")
+        password_hasher.shutdown()
+        image_pipeline.shutdown()
+        await async_engine.dispose()
 
     return app
 
@@ -1,10 +1,12 @@
-from app.models import active_session, audit_log, category, content, media_file, user  # noqa: F401
+from app.models import active_session, analytics, audit_log, category, content, dashboard, media_file, user  # noqa: F401
 
 __all__ = [
     "active_session",
+    "analytics",
     "audit_log",
     "category",
     "content",
+    "dashboard",
     "media_file",
     "user",
 ]
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -12,9 +12,12 @@ from app.db.base import Base
 
 class ActiveSession(Base):
     __tablename__ = "active_sessions"
+    __table_args__ = (
+        Index("ix_active_sessions_revoked_at", "revoked_at", postgresql_where=text("revoked")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     device_id: Mapped[str] = mapped_column(String(255), nullable=False)
     jwt_id: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
     issued_at: Mapped[datetime] = mapped_column(
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import enum
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, ForeignKey, Index, Integer, LargeBinary, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ContentReadDaily(Base):
+    """每篇內容每日的閱讀次數與不重複讀者 HyperLogLog 草圖"""
+
+    __tablename__ = "content_read_daily"
+    __table_args__ = (Index("ix_content_read_daily_day", "day"),)
+
+    content_id: Mapped[int] = mapped_column(ForeignKey("contents.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    views: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    unique_readers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    readers: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class ReadWindow(enum.IntEnum):
+    """預先彙總的統計期間（天）"""
+
+    WEEK = 7
+    MONTH = 30
+    QUARTER = 90
+    YEAR = 365
+
+
+class ContentReadWindow(Base):
+    """每篇內容最近 N 天的閱讀次數與合併後的讀者草圖；flush 時累加，期間起日過時由背景工作自每日資料重算"""
+
+    __tablename__ = "content_read_windows"
+    __table_args__ = (
+        Index("ix_content_read_windows_views", "window_days", "views"),
+        Index("ix_content_read_windows_start_day", "window_days", "start_day"),
+    )
+
+    content_id: Mapped[int] = mapped_column(ForeignKey("contents.id", ondelete="CASCADE"), primary_key=True)
+    window_days: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    start_day: Mapped[date] = mapped_column(Date, nullable=False)
+    views: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    unique_readers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    readers: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
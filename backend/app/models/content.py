@@ -5,8 +5,8 @@ import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, Computed, DateTime, Enum, ForeignKey, Index, Integer, String, Text, event
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -23,8 +23,40 @@ class ContentStatus(str, enum.Enum):
     ARCHIVED = "archived"
 
 
+# 全文檢索向量：標題/slug 權重 A、標籤 B、去除 HTML 標籤後的內文 C。
+# 使用 'simple' 設定，不做語系詞幹處理，英文等以空白分詞的內容可用前綴比對；
+# 'simple' 會把連續的中文字串當成單一詞彙，含 CJK 的查詢改用下方的 n-gram 索引。
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(slug, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('simple', regexp_replace(coalesce(body, ''), '<[^>]+>', ' ', 'g')), 'C')"
+)
+
+# 中日韓文字（Python re 與 PostgreSQL 正規表示式皆支援 \uXXXX）
+CJK_CLASS = r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+# 標題/slug/標籤中含 CJK 字元的單字與雙字 n-gram（GIN 索引）：中文查詢多為 1~2 個字，
+# pg_trgm 無法以索引處理少於 3 個字的 ILIKE，改以 n-gram 篩選候選列，再以 ILIKE 確認。
+CONTENT_NGRAMS_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION content_ngrams(value text) RETURNS text[]
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT coalesce(array_agg(DISTINCT gram), '{{}}')
+    FROM (
+        SELECT substr(lower(value), i, n) AS gram, n
+        FROM generate_series(1, char_length(value)) AS i, (VALUES (1), (2)) AS sizes(n)
+    ) AS grams
+    WHERE char_length(gram) = n AND gram !~ '\s' AND gram ~ '{CJK_CLASS}'
+$$
+"""
+SEARCH_NGRAMS_SQL = "content_ngrams(coalesce(title, '') || ' ' || coalesce(slug, '') || ' ' || coalesce(tags, ''))"
+
+
 class Content(Base):
     __tablename__ = "contents"
+    __table_args__ = (
+        Index("ix_contents_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_contents_search_ngrams", "search_ngrams", postgresql_using="gin"),
+        Index("ix_contents_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -39,7 +71,12 @@ class Content(Base):
     meta_description: Mapped[str | None] = mapped_column(String(255))
     cover_image_url: Mapped[str | None] = mapped_column(String(500))
     tags: Mapped[str | None] = mapped_column(String(255))
+    excerpt: Mapped[str | None] = mapped_column(String(300))
     is_deleted: Mapped[bool] = mapped_column(default=False)
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), deferred=True)
+    search_ngrams: Mapped[list[str] | None] = mapped_column(
+        ARRAY(Text), Computed(SEARCH_NGRAMS_SQL, persisted=True), deferred=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -52,3 +89,11 @@ class Content(Base):
     category: Mapped["Category | None"] = relationship(back_populates="contents")
     author: Mapped["User | None"] = relationship(back_populates="contents")
     media_links: Mapped[list["ContentMedia"]] = relationship(back_populates="content", cascade="all, delete-orphan")
+
+
+# search_ngrams 的產生欄位需要 content_ngrams 函式（開發環境以 create_all 建表時使用）
+event.listen(
+    Content.__table__,
+    "before_create",
+    DDL(CONTENT_NGRAMS_FUNCTION_SQL).execute_if(dialect="postgresql"),
+)
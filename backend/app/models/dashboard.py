@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import BigInteger, Date, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class AuditDailyCount(Base):
+    """每日各 action 的事件數，寫入 audit_logs 時於同一個交易累加"""
+
+    __tablename__ = "audit_daily_counts"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    action: Mapped[str] = mapped_column(String(100), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class DashboardCounter(Base):
+    """Dashboard 用的彙總數字（會員數、內容數等），由新增 / 封存資料的交易累加"""
+
+    __tablename__ = "dashboard_counters"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
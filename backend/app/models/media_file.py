@@ -4,8 +4,8 @@ import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -16,6 +16,10 @@ if TYPE_CHECKING:
 
 class MediaFile(Base):
     __tablename__ = "media_files"
+    __table_args__ = (
+        Index("ix_media_files_created_at_id", "created_at", "id"),
+        Index("ix_media_files_last_uploaded_at_id", "last_uploaded_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -23,10 +27,23 @@ class MediaFile(Base):
     url: Mapped[str] = mapped_column(String(500), nullable=False, unique=True)
     content_type: Mapped[str] = mapped_column(String(100), nullable=False)
     size: Mapped[int] = mapped_column(Integer, nullable=False)
+    # 檔案內容的 SHA-256；相同內容只存一份
+    content_hash: Mapped[str | None] = mapped_column(String(64), unique=True)
+    # 圖片尺寸、LQIP 占位圖與衍生檔（由 ImagePipeline 於背景產生）
+    width: Mapped[int | None] = mapped_column(Integer)
+    height: Mapped[int | None] = mapped_column(Integer)
+    lqip: Mapped[str | None] = mapped_column(Text)
+    variants: Mapped[dict | None] = mapped_column(JSON().with_variant(JSONB(), "postgresql"))
+    # 引用此媒體的內容數，由 sync_content_media 在同一個交易中維護
+    usage_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0", index=True)
     uploaded_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    # 最近一次上傳（含內容相同的重複上傳）的時間；GC 的寬限期以此計算
+    last_uploaded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), server_default=func.now()
+    )
 
     usages: Mapped[list["ContentMedia"]] = relationship(back_populates="media", cascade="all, delete-orphan")
 
@@ -1,6 +1,7 @@
-from app.routers import audit, auth, categories, contents, dashboard, media, members, uploads  # noqa: F401
+from app.routers import analytics, audit, auth, categories, contents, dashboard, media, members, public, uploads  # noqa: F401
 
 __all__ = [
+    "analytics",
     "audit",
     "auth",
     "categories",
@@ -8,5 +9,6 @@ __all__ = [
     "dashboard",
     "media",
     "members",
+    "public",
     "uploads",
 ]
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import get_db
+from app.dependencies.auth import get_current_admin_user
+from app.models.analytics import ReadWindow
+from app.schemas.analytics import ContentReadersOut, ContentReadTrendOut, TopContentOut
+from app.services.read_analytics import content_readers, content_trend, top_contents
+
+settings = get_settings()
+router = APIRouter(prefix=f"{settings.api_prefix}/analytics", tags=["Analytics"])
+
+# 彙總資料每隔 read_analytics_flush_seconds 由各 worker 寫入，統計結果會有相應延遲；
+# top 與 readers 只提供預先彙總的期間（7 / 30 / 90 / 365 天）
+
+
+@router.get("/contents/top", response_model=list[TopContentOut])
+def list_top_contents(
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_admin_user),
+    days: ReadWindow = Query(default=ReadWindow.WEEK),
+    limit: int = Query(default=10, ge=1, le=50),
+) -> list[TopContentOut]:
+    return top_contents(db, days=days, limit=limit)
+
+
+@router.get("/contents/{content_id}/trend", response_model=list[ContentReadTrendOut])
+def get_content_trend(
+    content_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_admin_user),
+    days: int = Query(default=30, ge=1, le=365),
+) -> list[ContentReadTrendOut]:
+    return content_trend(db, content_id, days=days)
+
+
+@router.get("/contents/{content_id}/readers", response_model=ContentReadersOut)
+def get_content_readers(
+    content_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_admin_user),
+    days: ReadWindow = Query(default=ReadWindow.MONTH),
+) -> ContentReadersOut:
+    views, readers = content_readers(db, content_id, days=days)
+    return ContentReadersOut(content_id=content_id, days=days, views=views, unique_readers=readers)
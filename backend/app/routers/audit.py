@@ -1,4 +1,12 @@
-from fastapi import APIRouter, Depends, Query, Request
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
@@ -6,21 +14,72 @@ from app.db.session import get_db
 from app.dependencies.auth import get_current_admin_user, get_current_user
 from app.models.audit_log import AuditLog
 from app.schemas.audit import AuditLogOut, AuditTrackRequest
-from app.services.audit import record_audit_log
+from app.services.audit import audit_log_filters, audit_values, queue_audit_log, write_audit_rows
+from app.services.audit_export import stream_audit_export
+from app.services.read_analytics import read_analytics
+from app.utils.pagination import created_before, decode_created_cursor, set_next_cursor
 
 settings = get_settings()
 router = APIRouter(prefix=f"{settings.api_prefix}/audit", tags=["Audit"])
 
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+_track_batch = TypeAdapter(list[AuditTrackRequest])
+_raw_batch = TypeAdapter(list[Any])
+
+
+async def _read_limited_body(request: Request, max_bytes: int) -> bytes:
+    """逐塊讀取請求內容，超過 max_bytes 立即回 413，不把過大的請求整個讀進記憶體"""
+    too_large = HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Request body too large")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+def _parse_track_batch(raw: bytes, content_type: str) -> list[AuditTrackRequest]:
+    """JSON 陣列或 NDJSON（每行一個事件）；先確認事件數未超過上限，再逐一驗證事件內容"""
+    try:
+        if content_type in NDJSON_MEDIA_TYPES:
+            lines = [line for line in raw.splitlines() if line.strip()]
+            if len(lines) > settings.audit_track_batch_max_events:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Too many events")
+            return _track_batch.validate_json(b"[" + b",".join(lines) + b"]")
+        items = _raw_batch.validate_json(raw)
+        if len(items) > settings.audit_track_batch_max_events:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Too many events")
+        return _track_batch.validate_python(items)
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors(include_url=False)) from None
+
+
+def _meta_filter(meta: str | None, device_id: str | None) -> dict | None:
+    """meta 參數為 JSON 物件字串，以包含（@>）方式比對；device_id 為常用條件的簡寫"""
+    condition: dict = {}
+    if meta:
+        try:
+            condition = json.loads(meta)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="meta 必須是 JSON 物件") from None
+        if not isinstance(condition, dict):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="meta 必須是 JSON 物件")
+    if device_id:
+        condition["device_id"] = device_id
+    return condition or None
+
 
 @router.post("/track")
-def track_event(
+async def track_event(
     payload: AuditTrackRequest,
     request: Request,
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
 ) -> dict:
-    record_audit_log(
-        db,
+    await queue_audit_log(
         user=current_user,
         action=payload.action,
         target_id=payload.target_id,
@@ -28,22 +87,131 @@ def track_event(
         ip_address=request.client.host if request.client else None,
         meta=payload.meta,
     )
-    db.commit()
+    read_analytics.record_event(payload.action, payload.target_id, str(current_user.id))
     return {"detail": "Recorded"}
 
 
+@router.post(
+    "/track/batch",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/AuditTrackRequest"}}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def track_events_batch(
+    request: Request,
+    current_user=Depends(get_current_user),
+) -> dict:
+    # 前端累積事件後定期送出：一次驗證、一次認證、單一 INSERT
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+    raw = await _read_limited_body(request, settings.audit_track_batch_max_bytes)
+    events = _parse_track_batch(raw, content_type)
+    if events:
+        ip_address = request.client.host if request.client else None
+        await write_audit_rows(
+            [
+                audit_values(
+                    user=current_user,
+                    action=event.action,
+                    target_id=event.target_id,
+                    device_info=event.device_info,
+                    ip_address=ip_address,
+                    meta=event.meta,
+                )
+                for event in events
+            ]
+        )
+        for event in events:
+            read_analytics.record_event(event.action, event.target_id, str(current_user.id))
+    return {"detail": "Recorded", "count": len(events)}
+
+
 @router.get("/logs", response_model=list[AuditLogOut])
 def list_logs(
     *,
+    response: Response,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_admin_user),
+    user_id: uuid.UUID | None = Query(default=None),
+    action: str | None = Query(default=None, max_length=100),
+    target_id: str | None = Query(default=None, max_length=100),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    meta: str | None = Query(default=None, max_length=500, description='JSON 物件，例如 {"device_id": "abc"}'),
+    device_id: str | None = Query(default=None, max_length=255),
     skip: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=100, le=200),
 ) -> list[AuditLogOut]:
-    return (
-        db.query(AuditLog)
-        .order_by(AuditLog.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    filters = audit_log_filters(
+        user_id=user_id,
+        action=action,
+        target_id=target_id,
+        since=since,
+        until=until,
+        meta=_meta_filter(meta, device_id),
+    )
+    query = db.query(AuditLog).filter(*filters).order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+    if cursor:
+        position = decode_created_cursor(cursor)
+        # 額外的 created_at 上界讓 planner 能做分割裁剪（row comparison 本身不會觸發）
+        query = query.filter(
+            AuditLog.created_at <= position[0],
+            created_before(AuditLog.created_at, AuditLog.id, position),
+        )
+    else:
+        query = query.offset(skip)
+    items = query.limit(limit).all()
+    set_next_cursor(response, items, limit, "created_at", "id")
+    return items
+
+
+@router.get("/export")
+async def export_logs(
+    *,
+    request: Request,
+    current_user=Depends(get_current_admin_user),
+    format: Literal["csv", "ndjson"] = Query(default="csv"),
+    gzip: bool = Query(default=False),
+    user_id: uuid.UUID | None = Query(default=None),
+    action: str | None = Query(default=None, max_length=100),
+    target_id: str | None = Query(default=None, max_length=100),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    meta: str | None = Query(default=None, max_length=500),
+    device_id: str | None = Query(default=None, max_length=255),
+) -> StreamingResponse:
+    filters = audit_log_filters(
+        user_id=user_id,
+        action=action,
+        target_id=target_id,
+        since=since,
+        until=until,
+        meta=_meta_filter(meta, device_id),
+    )
+    # 匯出本身也是需要留存的稽核事件
+    await queue_audit_log(
+        user=current_user,
+        action="export_audit_logs",
+        ip_address=request.client.host if request.client else None,
+        meta={
+            "format": format,
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat() if until else None,
+        },
+    )
+    filename = f"audit_logs_{datetime.now(tz=timezone.utc):%Y%m%dT%H%M%SZ}.{format}"
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        stream_audit_export(filters, format, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
@@ -1,32 +1,38 @@
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.db.session import get_db
+from app.core.rate_limit import limiter
+from app.db.session import get_async_db
 from app.dependencies.auth import get_current_user
 from app.models.user import User
 from app.schemas.auth import LoginRequest, Token
 from app.schemas.user import UserOut
 from app.services.audit import record_audit_log
-from app.utils.security import create_access_token, verify_password
+from app.services.passwords import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.sessions import new_session, revocation_filter, revoke_sessions_stmt
+from app.utils.security import create_access_token
 
 settings = get_settings()
 router = APIRouter(prefix=f"{settings.api_prefix}/auth", tags=["Auth"])
 
-# 為認證路由創建專用的速率限制器
-limiter = Limiter(key_func=get_remote_address)
-
 
 @router.post("/login", response_model=Token)
 @limiter.limit(f"{settings.rate_limit_max}/{settings.rate_limit_window}seconds")
-def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)) -> Token:
-    user: User | None = db.query(User).filter(User.email == payload.email).first()
-    if user is None or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)) -> Token:
+    result = await db.execute(select(User).where(User.email == payload.email))
+    user: User | None = result.scalars().first()
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    verified, new_hash = await password_hasher.verify_and_update(payload.password, user.password_hash)
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        user.password_hash = new_hash  # 舊 hash 的 cost 已過時，登入時順便升級
 
     user.token_version += 1
     user.force_logout_flag = False
@@ -34,9 +40,15 @@ def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)
     user.last_login_at = datetime.now(tz=timezone.utc)
     db.add(user)
 
+    # 單裝置限制：登入會讓先前的 token 失效，registry 中舊 session 一併標記撤銷
+    revoked = (await db.execute(revoke_sessions_stmt(user.id))).all()
+    session = new_session(user.id, payload.device_id)
+    db.add(session)
+
     token, expires_at = create_access_token(
         subject=str(user.id),
         token_version=user.token_version,
+        jwt_id=session.jwt_id,
         secret_key=settings.secret_key,
         algorithm=settings.algorithm,
         expires_minutes=settings.jwt_expire_minutes,
@@ -49,31 +61,36 @@ def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)
         ip_address=request.client.host if request.client else None,
         meta={"device_id": payload.device_id},
     )
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate(user.id)
+    revocation_filter.add_many(revoked)
 
     return Token(access_token=token, expires_at=expires_at)
 
 
 @router.post("/logout")
-def logout(
+async def logout(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
     current_user.token_version += 1
     current_user.force_logout_flag = False
     db.add(current_user)
+    revoked = (await db.execute(revoke_sessions_stmt(current_user.id))).all()
     record_audit_log(
         db,
         user=current_user,
         action="logout",
         ip_address=request.client.host if request.client else None,
     )
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate(current_user.id)
+    revocation_filter.add_many(revoked)
 
     return {"detail": "Logged out"}
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)) -> UserOut:
+async def me(current_user: User = Depends(get_current_user)) -> UserOut:
     return current_user
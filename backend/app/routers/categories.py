@@ -7,7 +7,7 @@ from app.dependencies.auth import get_current_admin_user
 from app.models.category import Category
 from app.models.content import Content
 from app.schemas.category import CategoryCreate, CategoryOut, CategoryUpdate
-from app.services.audit import record_audit_log
+from app.services.audit import queue_audit_log_from_thread
 
 settings = get_settings()
 router = APIRouter(prefix=f"{settings.api_prefix}/categories", tags=["Categories"])
@@ -28,14 +28,13 @@ def create_category(
     category = Category(**payload.model_dump())
     db.add(category)
     db.flush()
-    record_audit_log(
-        db,
+    db.commit()
+    queue_audit_log_from_thread(
         user=current_user,
         action="create_category",
         target_id=str(category.id),
         ip_address=request.client.host if request.client else None,
     )
-    db.commit()
     db.refresh(category)
     return category
 
@@ -56,14 +55,13 @@ def update_category(
         setattr(category, key, value)
 
     db.add(category)
-    record_audit_log(
-        db,
+    db.commit()
+    queue_audit_log_from_thread(
         user=current_user,
         action="update_category",
         target_id=str(category.id),
         ip_address=request.client.host if request.client else None,
     )
-    db.commit()
     db.refresh(category)
     return category
 
@@ -84,12 +82,11 @@ def delete_category(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Category has contents")
 
     db.delete(category)
-    record_audit_log(
-        db,
+    db.commit()
+    queue_audit_log_from_thread(
         user=current_user,
         action="delete_category",
         target_id=str(category.id),
         ip_address=request.client.host if request.client else None,
     )
-    db.commit()
     return {"detail": "Category deleted"}
@@ -1,43 +1,91 @@
-from typing import Optional
+from typing import Any, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import and_, select
+from sqlalchemy.orm import load_only
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.db.session import get_db
+from app.core.rate_limit import limiter
+from app.db.session import get_async_db
 from app.dependencies.auth import get_current_admin_user
 from app.models.content import Content, ContentStatus
-from app.schemas.content import ContentCreate, ContentOut, ContentUpdate
-from app.services.audit import record_audit_log
-from app.services.content_media import sync_content_media
+from app.schemas.content import ContentCreate, ContentOut, ContentSummaryOut, ContentUpdate
+from app.services.audit import queue_audit_log
+from app.services.content_media import sync_content_media, sync_content_media_state
+from app.services.content_search import search_condition, search_rank
+from app.services.dashboard_rollups import counter_delta_stmt
+from app.services.public_contents import published_contents
+from app.utils.html import make_excerpt
+from app.utils.pagination import NEXT_CURSOR_HEADER, created_before, decode_created_cursor, set_next_cursor
 
 settings = get_settings()
 router = APIRouter(prefix=f"{settings.api_prefix}/contents", tags=["Contents"])
-limiter = Limiter(key_func=get_remote_address)
+
+LIST_FIELDS = tuple(ContentOut.model_fields)
+SUMMARY_FIELDS = tuple(ContentSummaryOut.model_fields)
+# cursor 與排序需要的欄位，投影時一律載入
+KEY_FIELDS = ("id", "created_at")
+
+_projection_list = TypeAdapter(list[dict[str, Any]])
+
+
+def _projected_fields(view: str, fields: str | None) -> tuple[str, ...] | None:
+    """回傳要輸出的欄位；None 表示完整的 ContentOut"""
+    if fields:
+        selected = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in selected if name not in LIST_FIELDS]
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "fields 不可為空",
+            )
+        return selected
+    if view == "summary":
+        return SUMMARY_FIELDS
+    return None
+
+
+def _projected_response(response: Response, items: list[Content], selected: tuple[str, ...]) -> Response:
+    rows = [{name: getattr(item, name) for name in selected} for item in items]
+    headers = {}
+    if NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return Response(content=_projection_list.dump_json(rows), media_type="application/json", headers=headers)
 
 
 @router.get("", response_model=list[ContentOut])
 @limiter.limit("60/minute")
-def list_contents(
+async def list_contents(
     *,
     request: Request,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_admin_user),
     category_id: int | None = Query(default=None),
     status_filter: Optional[ContentStatus] = Query(default=None, alias="status"),
     search: str | None = Query(default=None, max_length=100),
     include_deleted: bool = Query(default=False),
+    order: Literal["created_at", "relevance"] = Query(default="created_at"),
+    view: Literal["full", "summary"] = Query(default="full"),
+    fields: str | None = Query(default=None, max_length=500, description="以逗號分隔的輸出欄位，例如 id,title,status"),
     skip: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=50, le=100),
-) -> list[ContentOut]:
+) -> list[ContentOut] | Response:
     # 驗證搜尋字串長度，防止 DoS
     if search and len(search) > 100:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="搜尋字串過長")
-
-    query = db.query(Content)
+    if cursor and order == "relevance":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="cursor 不支援 relevance 排序")
+
+    selected = _projected_fields(view, fields)
+    query = select(Content)
+    if selected is not None:
+        # 列表投影只讀取需要的欄位，body 等大型欄位不會從資料庫取出；誤觸未載入欄位直接報錯
+        columns = dict.fromkeys((*KEY_FIELDS, *selected))
+        query = query.options(load_only(*(getattr(Content, name) for name in columns), raiseload=True))
     filters = []
     if category_id:
         filters.append(Content.category_id == category_id)
@@ -46,95 +94,125 @@ def list_contents(
     if not include_deleted:
         filters.append(Content.is_deleted.is_(False))
     if filters:
-        query = query.filter(and_(*filters))
+        query = query.where(and_(*filters))
+    ts_query = None
     if search:
-        like = f"%{search.lower()}%"
-        query = query.filter(or_(Content.title.ilike(like), Content.slug.ilike(like)))
-    return query.order_by(Content.created_at.desc()).offset(skip).limit(limit).all()
+        # CJK 查詢改走子字串比對，沒有 tsquery；relevance 排序此時退回時間排序
+        condition, ts_query = search_condition(search)
+        if condition is None:
+            return []
+        query = query.where(condition)
+    if order == "relevance" and ts_query is not None:
+        query = query.order_by(search_rank(ts_query).desc(), Content.created_at.desc())
+        items = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
+        return items if selected is None else _projected_response(response, items, selected)
+
+    query = query.order_by(Content.created_at.desc(), Content.id.desc())
+    if cursor:
+        query = query.where(created_before(Content.created_at, Content.id, decode_created_cursor(cursor)))
+    else:
+        query = query.offset(skip)
+    items = (await db.execute(query.limit(limit))).scalars().all()
+    set_next_cursor(response, items, limit, "created_at", "id")
+    return items if selected is None else _projected_response(response, items, selected)
 
 
 @router.post("", response_model=ContentOut, status_code=status.HTTP_201_CREATED)
-def create_content(
+async def create_content(
     payload: ContentCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_admin_user),
 ) -> ContentOut:
-    existing = db.query(Content).filter(Content.slug == payload.slug).first()
+    existing = (await db.execute(select(Content.id).where(Content.slug == payload.slug))).first()
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Slug already exists")
 
-    content = Content(**payload.model_dump(), author_id=current_user.id)
+    content = Content(**payload.model_dump(), author_id=current_user.id, excerpt=make_excerpt(payload.body))
     db.add(content)
-    db.flush()
-    sync_content_media(db, content.id, content.body)
-    record_audit_log(
-        db,
+    await db.flush()
+    await db.run_sync(sync_content_media, content.id, content.body)
+    await db.execute(counter_delta_stmt("contents", 1))
+    await db.commit()
+    published_contents.invalidate(content.id)
+    await queue_audit_log(
         user=current_user,
         action="create_content",
         target_id=str(content.id),
         ip_address=request.client.host if request.client else None,
     )
-    db.commit()
-    db.refresh(content)
+    await db.refresh(content)
     return content
 
 
 @router.put("/{content_id}", response_model=ContentOut)
-def update_content(
+async def update_content(
     content_id: int,
     payload: ContentUpdate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_admin_user),
 ) -> ContentOut:
-    content = db.get(Content, content_id)
+    content = await db.get(Content, content_id)
     if not content:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
 
     data = payload.model_dump(exclude_unset=True)
     if "slug" in data:
-        conflict = db.query(Content).filter(Content.slug == data["slug"], Content.id != content_id).first()
+        conflict = (
+            await db.execute(select(Content.id).where(Content.slug == data["slug"], Content.id != content_id))
+        ).first()
         if conflict:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Slug already exists")
 
+    # body 未變動時不需重算摘要；媒體引用在 body 或封存狀態改變時重算（封存會解除連結，還原時需重新連結）
+    body_changed = "body" in data and data["body"] != content.body
+    was_deleted = content.is_deleted
     for key, value in data.items():
         setattr(content, key, value)
+    if body_changed:
+        content.excerpt = make_excerpt(content.body)
 
     db.add(content)
-    sync_content_media(db, content.id, content.body)
-    record_audit_log(
-        db,
+    if body_changed or content.is_deleted != was_deleted:
+        await db.run_sync(sync_content_media_state, content.id, content.body, is_deleted=content.is_deleted)
+    if content.is_deleted != was_deleted:
+        await db.execute(counter_delta_stmt("contents", -1 if content.is_deleted else 1))
+    await db.commit()
+    published_contents.invalidate(content.id)
+    await queue_audit_log(
         user=current_user,
         action="update_content",
         target_id=str(content.id),
         ip_address=request.client.host if request.client else None,
     )
-    db.commit()
-    db.refresh(content)
+    await db.refresh(content)
     return content
 
 
 @router.delete("/{content_id}")
-def delete_content(
+async def delete_content(
     content_id: int,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_admin_user),
 ) -> dict:
-    content = db.get(Content, content_id)
+    content = await db.get(Content, content_id)
     if not content:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
 
+    was_deleted = content.is_deleted
     content.is_deleted = True
     db.add(content)
-    sync_content_media(db, content.id, None)
-    record_audit_log(
-        db,
+    await db.run_sync(sync_content_media_state, content.id, content.body, is_deleted=True)
+    if not was_deleted:
+        await db.execute(counter_delta_stmt("contents", -1))
+    await db.commit()
+    published_contents.invalidate(content.id)
+    await queue_audit_log(
         user=current_user,
         action="delete_content",
         target_id=str(content.id),
         ip_address=request.client.host if request.client else None,
     )
-    db.commit()
     return {"detail": "Content archived"}
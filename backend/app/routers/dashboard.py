@@ -1,27 +1,35 @@
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.db.session import get_db
 from app.dependencies.auth import get_current_admin_user
 from app.models.audit_log import AuditLog
-from app.models.content import Content
-from app.models.user import User
+from app.models.dashboard import AuditDailyCount, DashboardCounter
 
 settings = get_settings()
 router = APIRouter(prefix=f"{settings.api_prefix}/dashboard", tags=["Dashboard"])
 
+TREND_WINDOWS = (7, 30, 90)
+
 
 @router.get("")
 def get_dashboard(db: Session = Depends(get_db), current_user=Depends(get_current_admin_user)) -> dict:
     now = datetime.now(tz=timezone.utc)
     seven_days_ago = now - timedelta(days=7)
 
-    member_count = db.query(func.count(User.id)).scalar() or 0
-    content_count = db.query(func.count(Content.id)).filter(Content.is_deleted.is_(False)).scalar() or 0
+    # 數量與趨勢皆讀自寫入時累加的彙總表；最近紀錄走 (action, created_at) 索引且只掃最近的分割
+    counters = dict(db.query(DashboardCounter.name, DashboardCounter.value).all())
+    today = now.date()
+    first_day = today - timedelta(days=max(TREND_WINDOWS) - 1)
+    daily: dict[str, list[int]] = defaultdict(lambda: [0] * max(TREND_WINDOWS))
+    for day, action, count in db.query(AuditDailyCount.day, AuditDailyCount.action, AuditDailyCount.count).filter(
+        AuditDailyCount.day >= first_day
+    ):
+        daily[action][(day - first_day).days] = count
     recent_logins = (
         db.query(AuditLog)
         .filter(AuditLog.action == "login", AuditLog.created_at >= seven_days_ago)
@@ -38,8 +46,12 @@ def get_dashboard(db: Session = Depends(get_db), current_user=Depends(get_curren
     )
 
     return {
-        "members": member_count,
-        "contents": content_count,
+        "members": counters.get("members", 0),
+        "contents": counters.get("contents", 0),
+        "trends": {
+            f"{days}d": {action: sum(series[-days:]) for action, series in daily.items()} for days in TREND_WINDOWS
+        },
+        "daily": {"start": first_day, "series": dict(daily)},
         "recent_logins": [
             {
                 "user_id": str(log.user_id) if log.user_id else None,
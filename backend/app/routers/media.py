@@ -1,58 +1,57 @@
 from __future__ import annotations
 
-import pathlib
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import RedirectResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.db.session import get_db
 from app.dependencies.auth import get_current_admin_user
-from app.models.media_file import ContentMedia, MediaFile
-from app.schemas.media import MediaFileOut
+from app.models.media_file import MediaFile
+from app.schemas.media import MediaFileOut, MediaGcStatsOut
+from app.services.images import choose_variant, needs_derivatives, variant_filenames
+from app.services.media_gc import media_gc_metrics
+from app.services.storage import storage
+from app.utils.pagination import created_before, decode_created_cursor, set_next_cursor
 
 settings = get_settings()
 router = APIRouter(prefix=f"{settings.api_prefix}/media", tags=["Media"])
-UPLOAD_DIR = pathlib.Path(settings.upload_dir)
 
 
 @router.get("", response_model=list[MediaFileOut])
 def list_media(
     *,
+    response: Response,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_admin_user),
     search: str | None = Query(default=None),
     skip: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
 ) -> list[MediaFileOut]:
-    query = (
-        db.query(
-            MediaFile,
-            func.count(ContentMedia.id).label("usage_count"),
-        )
-        .outerjoin(ContentMedia, ContentMedia.media_id == MediaFile.id)
-        .group_by(MediaFile.id)
-        .order_by(MediaFile.created_at.desc())
-    )
+    # usage_count 已反正規化到 media_files，列表只需沿 (created_at, id) 索引掃描
+    query = db.query(MediaFile).order_by(MediaFile.created_at.desc(), MediaFile.id.desc())
     if search:
         like = f"%{search.lower()}%"
         query = query.filter(func.lower(MediaFile.filename).like(like))
-    results = query.offset(skip).limit(limit).all()
-    return [
-        MediaFileOut(
-            id=media.id,
-            filename=media.filename,
-            original_filename=media.original_filename,
-            url=media.url,
-            content_type=media.content_type,
-            size=media.size,
-            created_at=media.created_at,
-            usage_count=usage_count,
+    if cursor:
+        query = query.filter(
+            created_before(MediaFile.created_at, MediaFile.id, decode_created_cursor(cursor, uuid.UUID))
         )
-        for media, usage_count in results
-    ]
+    else:
+        query = query.offset(skip)
+    results = query.limit(limit).all()
+    set_next_cursor(response, results, limit, "created_at", "id")
+    return [MediaFileOut.model_validate(media) for media in results]
+
+
+@router.get("/gc", response_model=MediaGcStatsOut)
+def media_gc_stats(current_user=Depends(get_current_admin_user)) -> MediaGcStatsOut:
+    """此 worker 的孤兒媒體回收統計與最近一次的報告"""
+    return MediaGcStatsOut.model_validate(media_gc_metrics)
 
 
 @router.delete("/{media_id}")
@@ -62,21 +61,40 @@ def delete_media(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_admin_user),
 ) -> dict:
-    media = db.get(MediaFile, media_id)
+    # 鎖定該列：同時有內容引用此媒體時，sync_content_media 的計數更新會等待刪除完成
+    media = db.get(MediaFile, media_id, with_for_update=True)
     if not media:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Media not found")
 
-    usage_count = db.query(ContentMedia).filter(ContentMedia.media_id == media_id).count()
-    if usage_count > 0:
+    if media.usage_count > 0:
         raise HTTPException(status_code=400, detail="Media is still used by contents")
 
-    file_path = UPLOAD_DIR / pathlib.Path(media.filename)
-    if file_path.exists():
-        try:
-            file_path.unlink()
-        except OSError:
-            pass
+    for filename in (media.filename, *variant_filenames(media)):
+        storage.delete(filename)
 
     db.delete(media)
     db.commit()
     return {"detail": "Media deleted"}
+
+
+@router.get("/image", response_class=RedirectResponse, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+def responsive_image(
+    request: Request,
+    *,
+    db: Session = Depends(get_db),
+    src: str = Query(..., max_length=500),
+    w: int | None = Query(default=None, ge=1, le=4096),
+) -> RedirectResponse:
+    """公開端點：依寬度與 Accept 轉址到最合適的衍生檔（AVIF/WebP/原格式），尚未產生時轉址到原檔"""
+    # 搬移到分層目錄前的平面 URL 也能找到同一個媒體
+    media = db.query(MediaFile).filter(MediaFile.url.in_(storage.url_aliases(src))).first()
+    if media is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Media not found")
+    filename = choose_variant(media, w, request.headers.get("accept", ""))
+    # 衍生檔尚在產生中時不要讓瀏覽器長時間快取指向原檔的轉址
+    cache_control = "no-cache" if needs_derivatives(media) else "public, max-age=86400"
+    return RedirectResponse(
+        storage.url_for(filename),
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        headers={"Vary": "Accept", "Cache-Control": cache_control},
+    )
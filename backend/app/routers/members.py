@@ -2,28 +2,45 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.dependencies.auth import get_current_admin_user
+from app.models.active_session import ActiveSession
 from app.models.user import User
+from app.schemas.session import ActiveSessionOut
 from app.schemas.user import UserCreate, UserOut, UserUpdate
 from app.services.audit import record_audit_log
-from app.utils.security import get_password_hash
+from app.services.dashboard_rollups import counter_delta_stmt
+from app.services.passwords import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.sessions import revocation_filter, revoke_sessions_stmt
+from app.utils.pagination import decode_id_cursor, set_next_cursor
 
 settings = get_settings()
 router = APIRouter(prefix=f"{settings.api_prefix}/members", tags=["Members"])
 
 
-def _get_member_or_404(db: Session, member_id: str) -> User:
+def _member_uuid(member_id: str) -> uuid.UUID:
     try:
-        member_uuid = uuid.UUID(member_id)
+        return uuid.UUID(member_id)
     except ValueError as exc:  # pragma: no cover - validation
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found") from exc
-    member = db.get(User, member_uuid)
+
+
+def _get_member_or_404(db: Session, member_id: str) -> User:
+    member = db.get(User, _member_uuid(member_id))
+    if not member:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
+    return member
+
+
+async def _get_member_or_404_async(db: AsyncSession, member_id: str) -> User:
+    member = await db.get(User, _member_uuid(member_id))
     if not member:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
     return member
@@ -32,27 +49,37 @@ def _get_member_or_404(db: Session, member_id: str) -> User:
 @router.get("", response_model=list[UserOut])
 def list_members(
     *,
+    response: Response,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_admin_user),
     search: str | None = Query(default=None, description="Search by name or email"),
     skip: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=50, le=100),
 ) -> list[UserOut]:
     query = db.query(User)
     if search:
         like = f"%{search.lower()}%"
         query = query.filter(or_(User.email.ilike(like), User.name.ilike(like)))
-    return query.offset(skip).limit(limit).all()
+    query = query.order_by(User.id)
+    if cursor:
+        query = query.filter(User.id > decode_id_cursor(cursor))
+    else:
+        query = query.offset(skip)
+    items = query.limit(limit).all()
+    set_next_cursor(response, items, limit, "id")
+    return items
 
 
+# 需要雜湊密碼的 endpoint 為 async：bcrypt 在 process pool 中執行，等待期間不佔用 threadpool
 @router.post("", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def create_member(
+async def create_member(
     payload: UserCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_admin_user),
 ) -> UserOut:
-    existing = db.query(User).filter(User.email == payload.email).first()
+    existing = (await db.execute(select(User.id).where(User.email == payload.email))).first()
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
 
@@ -61,10 +88,11 @@ def create_member(
         name=payload.name,
         role=payload.role,
         is_active=payload.is_active,
-        password_hash=get_password_hash(payload.password),
+        password_hash=await password_hasher.hash(payload.password),
     )
     db.add(user)
-    db.flush()
+    await db.flush()
+    await db.execute(counter_delta_stmt("members", 1))
     record_audit_log(
         db,
         user=current_user,
@@ -73,20 +101,20 @@ def create_member(
         meta={"name": user.name},
         ip_address=request.client.host if request.client else None,
     )
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.put("/{member_id}", response_model=UserOut)
-def update_member(
+async def update_member(
     member_id: str,
     payload: UserUpdate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_admin_user),
 ) -> UserOut:
-    member = _get_member_or_404(db, member_id)
+    member = await _get_member_or_404_async(db, member_id)
 
     if payload.name is not None:
         member.name = payload.name
@@ -94,9 +122,11 @@ def update_member(
         member.role = payload.role
     if payload.is_active is not None:
         member.is_active = payload.is_active
+    revoked = []
     if payload.password:
-        member.password_hash = get_password_hash(payload.password)
+        member.password_hash = await password_hasher.hash(payload.password)
         member.token_version += 1  # reset sessions if password changed
+        revoked = (await db.execute(revoke_sessions_stmt(member.id))).all()
 
     db.add(member)
     record_audit_log(
@@ -106,8 +136,10 @@ def update_member(
         target_id=str(member.id),
         ip_address=request.client.host if request.client else None,
     )
-    db.commit()
-    db.refresh(member)
+    await db.commit()
+    principal_cache.invalidate(member.id)
+    revocation_filter.add_many(revoked)
+    await db.refresh(member)
     return member
 
 
@@ -123,6 +155,7 @@ def delete_member(
     member.is_active = False
     member.token_version += 1
     db.add(member)
+    revoked = db.execute(revoke_sessions_stmt(member.id)).all()
     record_audit_log(
         db,
         user=current_user,
@@ -131,4 +164,48 @@ def delete_member(
         ip_address=request.client.host if request.client else None,
     )
     db.commit()
+    principal_cache.invalidate(member.id)
+    revocation_filter.add_many(revoked)
     return {"detail": "Member deactivated"}
+
+
+@router.get("/{member_id}/sessions", response_model=list[ActiveSessionOut])
+def list_member_sessions(
+    member_id: str,
+    *,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_admin_user),
+    include_revoked: bool = Query(default=False),
+) -> list[ActiveSessionOut]:
+    member = _get_member_or_404(db, member_id)
+    query = db.query(ActiveSession).filter(ActiveSession.user_id == member.id)
+    if not include_revoked:
+        query = query.filter(ActiveSession.revoked.is_(False))
+    return query.order_by(ActiveSession.issued_at.desc()).all()
+
+
+@router.delete("/{member_id}/sessions/{device_id}")
+def revoke_member_device(
+    member_id: str,
+    device_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_admin_user),
+) -> dict:
+    member = _get_member_or_404(db, member_id)
+
+    revoked = db.execute(revoke_sessions_stmt(member.id, device_id=device_id)).all()
+    if not revoked:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+
+    record_audit_log(
+        db,
+        user=current_user,
+        action="revoke_session",
+        target_id=str(member.id),
+        meta={"device_id": device_id},
+        ip_address=request.client.host if request.client else None,
+    )
+    db.commit()
+    revocation_filter.add_many(revoked)
+    return {"detail": "Session revoked", "revoked": len(revoked)}
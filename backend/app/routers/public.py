@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.core.config import get_settings
+from app.dependencies.auth import get_current_user
+from app.schemas.content import PublicContentDetail, PublicContentSummary
+from app.services.public_contents import RenderedResponse, published_contents
+
+settings = get_settings()
+router = APIRouter(prefix=f"{settings.api_prefix}/public/contents", tags=["Public"])
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _respond(request: Request, rendered: RenderedResponse, cache_control: str) -> Response:
+    headers = {"ETag": rendered.etag, "Cache-Control": cache_control}
+    if _etag_matches(request, rendered.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=rendered.body, media_type="application/json", headers=headers)
+
+
+def _public_cache_control() -> str:
+    return f"public, max-age={settings.public_content_cache_seconds}"
+
+
+@router.get("", responses={200: {"model": list[PublicContentSummary]}})
+async def list_published_contents(
+    request: Request,
+    category_id: int | None = Query(default=None),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+) -> Response:
+    snapshot = await published_contents.get()
+    return _respond(request, snapshot.list_contents(category_id, skip, limit), _public_cache_control())
+
+
+@router.get("/latest", responses={200: {"model": list[PublicContentSummary]}})
+async def latest_published_contents(
+    request: Request,
+    limit: int = Query(default=6, ge=1, le=50),
+) -> Response:
+    snapshot = await published_contents.get()
+    return _respond(request, snapshot.list_contents(None, 0, limit), _public_cache_control())
+
+
+@router.get("/by-id/{content_id}", responses={200: {"model": PublicContentSummary}})
+async def get_published_summary(content_id: int, request: Request) -> Response:
+    # 舊版以 id 為網址的文章連結，前台用來換成 slug 網址
+    snapshot = await published_contents.get()
+    rendered = snapshot.get_summary(content_id)
+    if rendered is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
+    return _respond(request, rendered, _public_cache_control())
+
+
+@router.get("/{slug}", responses={200: {"model": PublicContentDetail}})
+async def get_published_content(
+    slug: str,
+    request: Request,
+    current_user=Depends(get_current_user),
+) -> Response:
+    # 文章內文僅限會員閱讀：驗證走 token / principal 快取，內文依 slug 按需載入並快取
+    rendered = await published_contents.get_detail(slug)
+    if rendered is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
+    return _respond(request, rendered, "private, no-cache")
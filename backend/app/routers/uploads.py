@@ -1,56 +1,144 @@
 from __future__ import annotations
 
 import pathlib
-import uuid
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.dependencies.auth import get_current_admin_user
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.media_file import MediaFile
+from app.services.images import image_pipeline, needs_derivatives
+from app.services.storage import InvalidUpload, StagedUpload, UploadTooLarge, storage
 
 settings = get_settings()
 router = APIRouter(prefix=f"{settings.api_prefix}/uploads", tags=["Uploads"])
-UPLOAD_DIR = pathlib.Path(settings.upload_dir)
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+storage.root.mkdir(parents=True, exist_ok=True)
 
 ALLOWED_CONTENT_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
-MAX_SIZE_BYTES = 500 * 1024  # 500 KB
 
+UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"],
+            }
+        }
+    },
+}
 
-@router.post("", status_code=status.HTTP_201_CREATED)
+
+def _upload_response(media: MediaFile, *, deduplicated: bool) -> dict:
+    return {
+        "id": str(media.id),
+        "url": media.url,
+        "size": media.size,
+        "content_type": media.content_type,
+        "sha256": media.content_hash,
+        "deduplicated": deduplicated,
+    }
+
+
+async def _find_by_hash(db: AsyncSession, content_hash: str) -> MediaFile | None:
+    return (await db.execute(select(MediaFile).where(MediaFile.content_hash == content_hash))).scalar_one_or_none()
+
+
+async def _claim_by_hash(db: AsyncSession, content_hash: str) -> MediaFile | None:
+    """找出相同內容的既有媒體並更新 last_uploaded_at，讓 GC 從這次上傳重新計算寬限期。
+
+    鎖定該列後才更新：GC 正在刪除同一列時會等它 commit，之後找不到就改走新增流程。
+    """
+    media = (
+        await db.execute(select(MediaFile).where(MediaFile.content_hash == content_hash).with_for_update())
+    ).scalar_one_or_none()
+    if media is not None:
+        media.last_uploaded_at = datetime.now(timezone.utc)
+        await db.commit()
+    return media
+
+
+async def _reuse_existing(media: MediaFile, staged: StagedUpload) -> None:
+    """已有相同內容的媒體：丟棄暫存檔；若原檔意外遺失則以這次上傳補回"""
+    if await storage.exists(media.filename):
+        await storage.discard(staged)
+    else:
+        await storage.commit(staged, media.filename)
+
+
+@router.post("", status_code=status.HTTP_201_CREATED, openapi_extra={"requestBody": UPLOAD_REQUEST_BODY})
 async def upload_image(
-    file: UploadFile = File(...),
+    request: Request,
+    response: Response,
     current_user=Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
-    if file.content_type not in ALLOWED_CONTENT_TYPES:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file type")
+    # 直接串流解析請求本文：超過上限立即回應，不會先把整個檔案讀進記憶體
+    try:
+        staged = await storage.receive(
+            request,
+            field="file",
+            max_bytes=settings.upload_max_bytes,
+            allowed_content_types=ALLOWED_CONTENT_TYPES,
+        )
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large (max {settings.upload_max_bytes // 1024}KB)",
+        ) from None
+    except InvalidUpload as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from None
+    except OSError as exc:  # pragma: no cover - simple IO failure
+        raise HTTPException(status_code=500, detail="Failed to save file") from exc
 
-    suffix = pathlib.Path(file.filename).suffix.lower() if file.filename else ""
-    filename = f"{uuid.uuid4().hex}{suffix}"
-    destination = UPLOAD_DIR / filename
+    # 以內容雜湊定址：相同檔案重複上傳時直接回傳既有的媒體
+    existing = await _claim_by_hash(db, staged.sha256)
+    if existing is not None:
+        await _reuse_existing(existing, staged)
+        if needs_derivatives(existing):
+            image_pipeline.schedule(existing.id, existing.filename)
+        response.status_code = status.HTTP_200_OK
+        return _upload_response(existing, deduplicated=True)
 
+    suffix = pathlib.Path(staged.original_filename).suffix.lower() if staged.original_filename else ""
+    filename = storage.key_for(f"{staged.sha256}{suffix}")
     try:
-        contents = await file.read()
-        if len(contents) > MAX_SIZE_BYTES:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File too large (max 500KB)")
-        destination.write_bytes(contents)
-    except Exception as exc:  # pragma: no cover - simple IO failure
+        url = await storage.commit(staged, filename)
+    except OSError as exc:  # pragma: no cover - simple IO failure
+        await storage.discard(staged)
         raise HTTPException(status_code=500, detail="Failed to save file") from exc
 
     media = MediaFile(
         filename=filename,
-        original_filename=file.filename or filename,
-        url=f"/uploads/{filename}",
-        content_type=file.content_type or "application/octet-stream",
-        size=len(contents),
+        original_filename=staged.original_filename or filename,
+        url=url,
+        content_type=staged.content_type or "application/octet-stream",
+        size=staged.size,
+        content_hash=staged.sha256,
         uploaded_by=current_user.id,
     )
     db.add(media)
-    db.commit()
-    db.refresh(media)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # 同一份內容被同時上傳：另一個請求先寫入，檔案內容相同所以不需刪除
+        await db.rollback()
+        existing = await _find_by_hash(db, staged.sha256)
+        if existing is None:
+            raise
+        if existing.filename != filename:
+            storage.delete(filename)
+        response.status_code = status.HTTP_200_OK
+        return _upload_response(existing, deduplicated=True)
+    await db.refresh(media)
 
-    return {"id": str(media.id), "url": media.url, "size": media.size, "content_type": media.content_type}
+    # 縮圖與新式格式在背景 process pool 產生，不延遲上傳回應
+    if needs_derivatives(media):
+        image_pipeline.schedule(media.id, media.filename)
+    return _upload_response(media, deduplicated=False)
@@ -0,0 +1,23 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class TopContentOut(BaseModel):
+    content_id: int
+    title: str
+    views: int
+    unique_readers: int
+
+
+class ContentReadTrendOut(BaseModel):
+    day: date
+    views: int
+    unique_readers: int
+
+
+class ContentReadersOut(BaseModel):
+    content_id: int
+    days: int
+    views: int
+    unique_readers: int
@@ -1,7 +1,8 @@
+import json
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 
 class AuditTrackRequest(BaseModel):
@@ -22,3 +23,11 @@ class AuditLogOut(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+    @field_validator("meta", mode="before")
+    @classmethod
+    def dump_meta(cls, value: object) -> str | None:
+        """meta 以 JSONB 儲存，輸出仍維持 JSON 字串以相容既有前端"""
+        if value is None or isinstance(value, str):
+            return value
+        return json.dumps(value)
@@ -12,6 +12,7 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     sub: str
     token_version: int
+    jti: str
     exp: int
 
 
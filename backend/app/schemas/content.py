@@ -40,8 +40,46 @@ class ContentUpdate(BaseModel):
 class ContentOut(ContentBase):
     id: int
     author_id: uuid.UUID | None = None
+    excerpt: str | None = None
     created_at: datetime
     updated_at: datetime
     is_deleted: bool
 
     model_config = {"from_attributes": True}
+
+
+class ContentSummaryOut(BaseModel):
+    id: int
+    title: str
+    slug: str
+    category_id: int | None = None
+    status: ContentStatus
+    author_id: uuid.UUID | None = None
+    cover_image_url: str | None = None
+    tags: str | None = None
+    excerpt: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    is_deleted: bool
+
+    model_config = {"from_attributes": True}
+
+
+class PublicContentSummary(BaseModel):
+    id: int
+    title: str
+    slug: str
+    category_id: int | None = None
+    meta_title: str | None = None
+    meta_description: str | None = None
+    cover_image_url: str | None = None
+    tags: str | None = None
+    excerpt: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class PublicContentDetail(PublicContentSummary):
+    body: str
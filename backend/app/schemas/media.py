@@ -13,7 +13,37 @@ class MediaFileOut(BaseModel):
     url: str
     content_type: str
     size: int
+    content_hash: str | None = None
+    width: int | None = None
+    height: int | None = None
+    lqip: str | None = None
+    variants: dict | None = None
     usage_count: int
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class MediaGcReportOut(BaseModel):
+    dry_run: bool
+    scanned: int
+    deleted: int
+    reclaimed_bytes: int
+    kept_as_cover: int
+    orphan_files: list[str]
+    missing_files: list[str]
+    orphan_files_deleted: int
+    orphan_bytes_reclaimed: int
+
+    model_config = {"from_attributes": True}
+
+
+class MediaGcStatsOut(BaseModel):
+    runs: int
+    deleted_total: int
+    reclaimed_bytes_total: int
+    last_run_at: datetime | None = None
+    last_duration_seconds: float | None = None
+    last_report: MediaGcReportOut | None = None
+
+    model_config = {"from_attributes": True}
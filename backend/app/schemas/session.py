@@ -0,0 +1,16 @@
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ActiveSessionOut(BaseModel):
+    id: int
+    user_id: uuid.UUID
+    device_id: str
+    jwt_id: str
+    issued_at: datetime
+    revoked: bool
+    revoked_at: datetime | None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,46 @@
+"""audit_logs 分割維護：補建未來月份分割並套用保留期
+
+    cd backend && python -m app.scripts.audit_partitions --dry-run
+    cd backend && python -m app.scripts.audit_partitions --retention-months 6 --mode drop
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from app.db.session import async_engine
+from app.services.audit_partitions import maintain_audit_partitions
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        report = await maintain_audit_partitions(
+            months_ahead=args.months_ahead,
+            retention_months=args.retention_months,
+            mode=args.mode,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await async_engine.dispose()
+    if report.skipped:
+        print("skipped : another process is maintaining audit partitions")
+        return
+    prefix = "[dry-run] " if args.dry_run else ""
+    print(f"{prefix}created : {', '.join(report.created) or '-'}")
+    print(f"{prefix}moved   : {', '.join(f'{name}={rows}' for name, rows in report.moved.items()) or '-'}")
+    print(f"{prefix}detached: {', '.join(report.detached) or '-'}")
+    print(f"{prefix}dropped : {', '.join(report.dropped) or '-'}")
+    print(f"{prefix}failed  : {', '.join(report.failed) or '-'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain audit_logs monthly partitions")
+    parser.add_argument("--months-ahead", type=int, default=None, help="預先建立的月份數（預設取設定值）")
+    parser.add_argument("--retention-months", type=int, default=None, help="保留月數，0 表示不清理")
+    parser.add_argument("--mode", choices=["detach", "drop"], default=None)
+    parser.add_argument("--dry-run", action="store_true", help="只列出將執行的動作")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
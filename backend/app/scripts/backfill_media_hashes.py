@@ -0,0 +1,71 @@
+"""為既有媒體檔回填 content_hash（SHA-256）
+
+    cd backend && python -m app.scripts.backfill_media_hashes [--dry-run]
+
+內容重複的舊檔只回填第一筆，其餘列出供人工處理（需改寫內容中的引用才能合併）。
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.models.media_file import MediaFile
+from app.services.storage import storage
+
+BATCH_SIZE = 200
+READ_SIZE = 1024 * 1024
+
+
+def file_sha256(filename: str) -> str | None:
+    path = storage.path_for(filename)
+    if not path.is_file():
+        return None
+    hasher = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(READ_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill MediaFile.content_hash from files on disk")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    updated = missing = duplicates = 0
+    with SessionLocal() as db:
+        known = dict(db.execute(select(MediaFile.content_hash, MediaFile.id).where(MediaFile.content_hash.is_not(None))).all())
+        last_id = None
+        while True:
+            query = select(MediaFile).where(MediaFile.content_hash.is_(None)).order_by(MediaFile.id).limit(BATCH_SIZE)
+            if last_id is not None:
+                query = query.where(MediaFile.id > last_id)
+            batch = db.scalars(query).all()
+            if not batch:
+                break
+            for media in batch:
+                digest = file_sha256(media.filename)
+                if digest is None:
+                    missing += 1
+                    print(f"missing file : {media.id} {media.filename}")
+                elif digest in known:
+                    duplicates += 1
+                    print(f"duplicate    : {media.id} {media.filename} (same as {known[digest]})")
+                else:
+                    known[digest] = media.id
+                    media.content_hash = digest
+                    updated += 1
+            last_id = batch[-1].id
+            if args.dry_run:
+                db.rollback()
+            else:
+                db.commit()
+    prefix = "[dry-run] " if args.dry_run else ""
+    print(f"{prefix}updated={updated} missing={missing} duplicates={duplicates}")
+
+
+if __name__ == "__main__":
+    main()
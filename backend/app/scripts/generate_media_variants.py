@@ -0,0 +1,85 @@
+"""為既有圖片產生縮圖、WebP/AVIF 與 LQIP（上傳時已自動產生，此腳本用於舊資料或重建）
+
+    cd backend && python -m app.scripts.generate_media_variants [--all] [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.models.media_file import MediaFile
+from app.services.images import DERIVABLE_CONTENT_TYPES, derivative_stem
+from app.services.storage import storage
+from app.utils.images import ImageTooLarge, render_derivatives, underivable
+
+settings = get_settings()
+BATCH_SIZE = 50
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render image derivatives for MediaFile rows")
+    parser.add_argument("--all", action="store_true", help="regenerate even if derivatives already exist")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    rendered = missing = failed = oversized = 0
+    with SessionLocal() as db:
+        last_id = None
+        while True:
+            query = (
+                select(MediaFile)
+                .where(MediaFile.content_type.in_(DERIVABLE_CONTENT_TYPES))
+                .order_by(MediaFile.id)
+                .limit(BATCH_SIZE)
+            )
+            if not args.all:
+                query = query.where(MediaFile.width.is_(None))
+            if last_id is not None:
+                query = query.where(MediaFile.id > last_id)
+            batch = db.scalars(query).all()
+            if not batch:
+                break
+            for media in batch:
+                source = storage.path_for(media.filename)
+                if not source.is_file():
+                    missing += 1
+                    print(f"missing file : {media.id} {media.filename}")
+                    continue
+                if args.dry_run:
+                    rendered += 1
+                    continue
+                try:
+                    result = render_derivatives(
+                        str(source),
+                        str(storage.root),
+                        derivative_stem(media.filename),
+                        max_pixels=settings.image_max_pixels,
+                    )
+                except ImageTooLarge as exc:
+                    # 標記為不產生衍生檔（width 已填入），之後不再重試
+                    oversized += 1
+                    print(f"too large    : {media.id} {media.filename} ({exc.width}x{exc.height})")
+                    result = underivable(exc.width, exc.height)
+                except Exception as exc:  # noqa: BLE001 - 單張失敗不中斷整批
+                    failed += 1
+                    print(f"failed       : {media.id} {media.filename} ({exc})")
+                    continue
+                media.width = result["width"]
+                media.height = result["height"]
+                media.lqip = result["lqip"]
+                media.variants = result["variants"]
+                rendered += 1
+            last_id = batch[-1].id
+            if args.dry_run:
+                db.rollback()
+            else:
+                db.commit()
+    prefix = "[dry-run] " if args.dry_run else ""
+    print(f"{prefix}rendered={rendered} missing={missing} failed={failed} oversized={oversized}")
+
+
+if __name__ == "__main__":
+    main()
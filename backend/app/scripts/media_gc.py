@@ -0,0 +1,57 @@
+"""回收沒有內容引用的媒體，並比對磁碟與 media_files 是否一致
+
+    cd backend && python -m app.scripts.media_gc [--dry-run] [--report] [--delete-orphan-files]
+
+--dry-run 只列出會刪除的數量與可釋放的空間；--report 列出每個孤兒檔與遺失檔案。
+背景任務以相同邏輯定期執行（見 MEDIA_GC_* 設定）。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from app.db.session import async_engine
+from app.services.media_gc import run_media_gc
+
+
+async def _run(args: argparse.Namespace) -> None:
+    try:
+        report = await run_media_gc(
+            dry_run=args.dry_run,
+            verify=not args.skip_verify,
+            delete_orphan_files=args.delete_orphan_files,
+            grace_hours=args.grace_hours,
+            max_deletes=args.max_deletes,
+        )
+    finally:
+        await async_engine.dispose()
+
+    prefix = "[dry-run] " if report.dry_run else ""
+    if args.report:
+        for name in report.orphan_files:
+            print(f"orphan file  : {name}")
+        for name in report.missing_files:
+            print(f"missing file : {name}")
+    print(
+        f"{prefix}scanned={report.scanned} deleted={report.deleted} reclaimed_bytes={report.reclaimed_bytes} "
+        f"kept_as_cover={report.kept_as_cover}"
+    )
+    print(
+        f"{prefix}orphan_files={len(report.orphan_files)} orphan_files_deleted={report.orphan_files_deleted} "
+        f"orphan_bytes={report.orphan_bytes_reclaimed} missing_files={len(report.missing_files)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Garbage-collect unreferenced media and verify storage")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--report", action="store_true", help="list every orphan/missing file")
+    parser.add_argument("--skip-verify", action="store_true", help="do not compare disk with media_files")
+    parser.add_argument("--delete-orphan-files", action="store_true", help="remove files without a media_files row")
+    parser.add_argument("--grace-hours", type=float, default=None)
+    parser.add_argument("--max-deletes", type=int, default=None)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""以全表計數校正 Dashboard 彙總表（還原備份、手動修改資料後使用）
+
+    cd backend && python -m app.scripts.rebuild_dashboard_rollups
+    cd backend && python -m app.scripts.rebuild_dashboard_rollups --since 2026-10-01
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import date
+
+from app.db.session import async_engine
+from app.services.dashboard_rollups import rebuild_dashboard_rollups
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        await rebuild_dashboard_rollups(args.since)
+    finally:
+        await async_engine.dispose()
+    print(f"rebuilt dashboard rollups since {args.since or 'the beginning'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recount dashboard counters and audit daily counts")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="只重算此日（UTC）之後的每日彙總")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""依 content_media 重新計算 media_files.usage_count
+
+    cd backend && python -m app.scripts.repair_media_usage [--dry-run]
+
+usage_count 平時由 sync_content_media 在交易中維護；手動改動資料庫或匯入資料後可執行此腳本修正。
+"""
+from __future__ import annotations
+
+import argparse
+
+from app.db.session import SessionLocal
+from app.services.content_media import find_usage_drift, repair_usage_counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute MediaFile.usage_count from content_media")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        drift = find_usage_drift(db)
+        for media_id, recorded, actual in drift:
+            print(f"drift        : {media_id} recorded={recorded} actual={actual}")
+        if args.dry_run:
+            print(f"[dry-run] drifted={len(drift)}")
+            return
+        repaired = repair_usage_counts(db)
+        db.commit()
+    print(f"repaired={repaired}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""把平放在 UPLOAD_DIR 的舊檔案搬到分層目錄（ab/cd/<name>），並改寫 media_files 與內容中的引用
+
+    cd backend && python -m app.scripts.shard_uploads [--dry-run] [--batch-size 200] [--pause 0.5] [--keep-flat]
+
+可在服務運行中執行，中斷後重跑會從尚未搬移的列繼續。每一批：
+1. 以硬連結（無法連結時複製）在新位置建立檔案，此時新舊路徑都可讀取
+2. 在同一個交易中改寫 media_files 的 filename / url / variants，以及引用這些媒體的內容內文與封面
+3. commit 之後才刪除舊的平面檔案；快取中仍使用舊 URL 的頁面由 /uploads 的 fallback 對應到新位置
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.content import Content
+from app.models.media_file import ContentMedia, MediaFile
+from app.services.storage import storage
+
+SIDECAR_SUFFIXES = (".br", ".gz")
+
+
+@dataclass
+class ShardStats:
+    media: int = 0
+    files: int = 0
+    missing: int = 0
+    contents: int = 0
+
+
+def _link(source: str, target: str) -> bool:
+    """在 target 建立與 source 相同的檔案；source 不存在時回傳 False"""
+    if os.path.exists(target):
+        return True
+    if not os.path.exists(source):
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        temp = f"{target}.part"
+        shutil.copy2(source, temp)
+        os.replace(temp, target)
+    return True
+
+
+def _file_moves(media: MediaFile) -> dict[str, str]:
+    """媒體的所有平面檔案（原檔、預壓縮版本、衍生檔）對應到的新 key"""
+    names = [media.filename, *(f"{media.filename}{suffix}" for suffix in SIDECAR_SUFFIXES)]
+    for variant in (media.variants or {}).values():
+        names.extend(variant.get("formats", {}).values())
+    return {name: storage.key_for(name) for name in names if "/" not in name}
+
+
+def _rewrite_variants(variants: dict | None, moves: dict[str, str]) -> dict | None:
+    if not variants:
+        return variants
+    rewritten = {}
+    for name, variant in variants.items():
+        formats = {fmt: moves.get(filename, filename) for fmt, filename in variant["formats"].items()}
+        rewritten[name] = {**variant, "formats": formats}
+    return rewritten
+
+
+def _rewrite_contents(db: Session, media_ids: list[uuid.UUID], url_moves: dict[str, str]) -> int:
+    """改寫內文與封面中的舊 URL；保留 updated_at，不讓資料搬移看起來像內容被編輯"""
+    linked = select(ContentMedia.content_id).where(ContentMedia.media_id.in_(media_ids))
+    contents = db.execute(
+        select(Content.id, Content.body, Content.cover_image_url)
+        .where(or_(Content.id.in_(linked), Content.cover_image_url.in_(url_moves)))
+        .order_by(Content.id)
+        .with_for_update()
+    ).all()
+    updates = []
+    for content_id, body, cover in contents:
+        new_body = body
+        for old, new in url_moves.items():
+            new_body = new_body.replace(old, new)
+        new_cover = url_moves.get(cover, cover) if cover else cover
+        if new_body != body or new_cover != cover:
+            updates.append({"b_id": content_id, "b_body": new_body, "b_cover": new_cover})
+    if updates:
+        db.connection().execute(
+            update(Content)
+            .where(Content.id == bindparam("b_id"))
+            .values(body=bindparam("b_body"), cover_image_url=bindparam("b_cover"), updated_at=Content.updated_at),
+            updates,
+        )
+    return len(updates)
+
+
+def shard_batch(db: Session, batch: list[MediaFile], stats: ShardStats, *, dry_run: bool, keep_flat: bool) -> None:
+    root = str(storage.root)
+    moved_files: list[str] = []
+    url_moves: dict[str, str] = {}
+    for media in batch:
+        moves = _file_moves(media)
+        for old, new in moves.items():
+            if dry_run:
+                found = os.path.exists(os.path.join(root, old))
+            else:
+                found = _link(os.path.join(root, old), os.path.join(root, new))
+            if found:
+                moved_files.append(old)
+            elif old == media.filename:
+                stats.missing += 1
+                print(f"missing file : {media.id} {media.filename}")
+        url_moves[storage.url_for(media.filename)] = storage.url_for(moves[media.filename])
+        for old, new in moves.items():
+            if old != media.filename and not old.endswith(SIDECAR_SUFFIXES):
+                url_moves[storage.url_for(old)] = storage.url_for(new)
+        media.filename = moves[media.filename]
+        media.url = storage.url_for(media.filename)
+        media.variants = _rewrite_variants(media.variants, moves)
+
+    stats.contents += _rewrite_contents(db, [media.id for media in batch], url_moves)
+    stats.media += len(batch)
+    stats.files += len(moved_files)
+    if dry_run:
+        db.rollback()
+        return
+    db.commit()
+    if not keep_flat:
+        for name in moved_files:
+            storage.delete(name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move flat upload files into the sharded ab/cd/<name> layout")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--pause", type=float, default=0.5, help="seconds to sleep between batches")
+    parser.add_argument("--keep-flat", action="store_true", help="leave the old flat files in place")
+    args = parser.parse_args()
+
+    stats = ShardStats()
+    with SessionLocal() as db:
+        last_id = None
+        while True:
+            query = (
+                select(MediaFile)
+                .where(~MediaFile.filename.contains("/"))
+                .order_by(MediaFile.id)
+                .limit(args.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            if last_id is not None:
+                query = query.where(MediaFile.id > last_id)
+            batch = db.scalars(query).all()
+            if not batch:
+                break
+            last_id = batch[-1].id
+            shard_batch(db, batch, stats, dry_run=args.dry_run, keep_flat=args.keep_flat)
+            print(f"progress     : media={stats.media} files={stats.files} contents={stats.contents}")
+            time.sleep(args.pause)
+    prefix = "[dry-run] " if args.dry_run else ""
+    print(f"{prefix}media={stats.media} files={stats.files} missing={stats.missing} contents={stats.contents}")
+
+
+if __name__ == "__main__":
+    main()
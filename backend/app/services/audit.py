@@ -1,16 +1,74 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import logging
 import uuid
+from datetime import datetime, timezone
+from typing import Any
 
+import anyio.from_thread
+from sqlalchemy import ColumnElement, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
+from app.db.session import async_engine
 from app.models.audit_log import AuditLog
 from app.models.user import User
+from app.services.dashboard_rollups import audit_daily_count_stmt
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def audit_values(
+    *,
+    user: User | uuid.UUID | None,
+    action: str,
+    target_id: str | None = None,
+    device_info: str | None = None,
+    ip_address: str | None = None,
+    meta: dict | None = None,
+) -> dict[str, Any]:
+    return {
+        "user_id": user.id if isinstance(user, User) else (user if isinstance(user, uuid.UUID) else None),
+        "action": action,
+        "target_id": target_id,
+        "device_info": device_info,
+        "ip_address": ip_address,
+        "meta": meta or None,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def audit_log_filters(
+    *,
+    user_id: uuid.UUID | None = None,
+    action: str | None = None,
+    target_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    meta: dict | None = None,
+) -> list[ColumnElement[bool]]:
+    """稽核紀錄查詢條件；各條件皆有對應的 (欄位, created_at) 複合索引，meta 以 @> 走 GIN 索引"""
+    filters: list[ColumnElement[bool]] = []
+    if user_id is not None:
+        filters.append(AuditLog.user_id == user_id)
+    if action:
+        filters.append(AuditLog.action == action)
+    if target_id:
+        filters.append(AuditLog.target_id == target_id)
+    if since is not None:
+        filters.append(AuditLog.created_at >= since)
+    if until is not None:
+        filters.append(AuditLog.created_at < until)
+    if meta:
+        filters.append(AuditLog.meta.contains(meta))
+    return filters
 
 
 def record_audit_log(
-    db: Session,
+    db: Session | AsyncSession,
     *,
     user: User | uuid.UUID | None,
     action: str,
@@ -19,13 +77,196 @@ def record_audit_log(
     ip_address: str | None = None,
     meta: dict | None = None,
 ) -> AuditLog:
+    """同步模式：與請求的交易一起 commit，用於登入、登出、帳號異動等安全相關紀錄"""
     log = AuditLog(
-        user_id=user.id if isinstance(user, User) else (user if isinstance(user, uuid.UUID) else None),
-        action=action,
-        target_id=target_id,
-        device_info=device_info,
-        ip_address=ip_address,
-        meta=json.dumps(meta) if meta else None,
+        **audit_values(
+            user=user,
+            action=action,
+            target_id=target_id,
+            device_info=device_info,
+            ip_address=ip_address,
+            meta=meta,
+        )
     )
     db.add(log)
     return log
+
+
+@event.listens_for(AuditLog, "after_insert")
+def _count_audit_log(mapper, connection, target: AuditLog) -> None:
+    # record_audit_log 走 ORM flush：在同一個交易累加每日彙總
+    connection.execute(audit_daily_count_stmt([{"created_at": target.created_at, "action": target.action}]))
+
+
+# 單一敘述最多 32767 個 bind 參數（PostgreSQL 協定 / asyncpg 上限），多列 INSERT 每列佔 audit_values 的欄位數
+MAX_BIND_PARAMS = 32767
+MAX_ROWS_PER_INSERT = MAX_BIND_PARAMS // len(audit_values(user=None, action=""))
+# 批次寫入失敗時的重試間隔上限（秒）
+MAX_RETRY_DELAY = 30.0
+
+
+async def write_audit_rows(rows: list[dict[str, Any]]) -> None:
+    """多列 INSERT 寫入（同一個交易），超過參數上限時分成多個敘述；每日彙總在同一個交易累加"""
+    async with async_engine.begin() as conn:
+        for start in range(0, len(rows), MAX_ROWS_PER_INSERT):
+            await conn.execute(insert(AuditLog).values(rows[start : start + MAX_ROWS_PER_INSERT]))
+        counts = audit_daily_count_stmt(rows)
+        if counts is not None:
+            await conn.execute(counts)
+
+
+class AuditWriter:
+    """背景批次寫入稽核紀錄：請求只把資料列放進有上限的佇列，由背景 task 依筆數或時間批次 INSERT。
+
+    佇列滿時 enqueue 會等待（backpressure）；關閉時先把佇列內的資料全部寫完。
+    寫入失敗時以指數退避重試，仍失敗則放回佇列等下一批；只有佇列已滿或正在關閉時才丟棄，並計入 dropped。
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        max_retries: int,
+        retry_delay: float,
+    ) -> None:
+        if batch_size > MAX_ROWS_PER_INSERT:
+            logger.warning("audit_batch_size=%d exceeds %d rows per INSERT, capping", batch_size, MAX_ROWS_PER_INSERT)
+        self.max_size = max_size
+        self.batch_size = max(1, min(batch_size, MAX_ROWS_PER_INSERT))
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.dropped = 0
+        self._queue: asyncio.Queue[dict[str, Any] | None] | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run(), name="audit_writer")
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def enqueue(self, row: dict[str, Any]) -> None:
+        if not self.running:
+            # 尚未啟動（例如腳本或未觸發 startup 的情境）時直接寫入
+            await write_audit_rows([row])
+            return
+        await self._queue.put(row)
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._flush(batch, requeue=not stopping)
+
+        # 關閉訊號之後才被放回佇列的資料列：最後再寫一次
+        leftover = []
+        while not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not None:
+                leftover.append(row)
+        if leftover:
+            await self._flush(leftover, requeue=False)
+
+    async def _flush(self, batch: list[dict[str, Any]], *, requeue: bool) -> None:
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                await write_audit_rows(batch)
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception("Failed to write %d audit log rows after %d attempts", len(batch), attempt + 1)
+                    break
+                logger.warning(
+                    "Failed to write %d audit log rows, retrying in %.1fs", len(batch), delay, exc_info=True
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+        # 放回佇列等下一批再試（佇列有上限，不會無限累積）；放不下或關閉中才丟棄
+        kept = 0
+        if requeue:
+            for row in batch:
+                try:
+                    self._queue.put_nowait(row)
+                except asyncio.QueueFull:
+                    break
+                kept += 1
+        lost = len(batch) - kept
+        if lost:
+            self.dropped += lost
+            logger.error("Dropped %d audit log rows (total dropped: %d)", lost, self.dropped)
+
+
+audit_writer = AuditWriter(
+    max_size=settings.audit_queue_max_size,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval_seconds,
+    max_retries=settings.audit_flush_max_retries,
+    retry_delay=settings.audit_flush_retry_seconds,
+)
+
+
+async def queue_audit_log(
+    *,
+    user: User | uuid.UUID | None,
+    action: str,
+    target_id: str | None = None,
+    device_info: str | None = None,
+    ip_address: str | None = None,
+    meta: dict | None = None,
+) -> None:
+    """非同步模式：交給 AuditWriter 批次寫入，應在業務交易 commit 之後呼叫"""
+    await audit_writer.enqueue(
+        audit_values(
+            user=user,
+            action=action,
+            target_id=target_id,
+            device_info=device_info,
+            ip_address=ip_address,
+            meta=meta,
+        )
+    )
+
+
+def queue_audit_log_from_thread(**kwargs: Any) -> None:
+    """供同步（threadpool）路由使用，回到事件迴圈排入佇列"""
+    anyio.from_thread.run(lambda: queue_audit_log(**kwargs))
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Literal
+
+from sqlalchemy import ColumnElement, select
+
+from app.db.session import engine
+from app.models.audit_log import AuditLog
+
+ExportFormat = Literal["csv", "ndjson"]
+
+EXPORT_COLUMNS = (
+    AuditLog.id,
+    AuditLog.created_at,
+    AuditLog.user_id,
+    AuditLog.action,
+    AuditLog.target_id,
+    AuditLog.ip_address,
+    AuditLog.device_info,
+    AuditLog.meta,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+# 每批自伺服器端 cursor 取回的列數
+EXPORT_BATCH_SIZE = 5000
+
+
+def _json_default(value: object) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _csv_value(value: object) -> object:
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunk(rows: list) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows: list) -> str:
+    return "".join(json.dumps(dict(zip(EXPORT_FIELDS, row)), default=_json_default) + "\n" for row in rows)
+
+
+def _text_chunks(filters: list[ColumnElement[bool]], fmt: ExportFormat) -> Iterator[str]:
+    if fmt == "csv":
+        yield ",".join(EXPORT_FIELDS) + "\r\n"
+    render = _csv_chunk if fmt == "csv" else _ndjson_chunk
+    query = select(*EXPORT_COLUMNS).where(*filters).order_by(AuditLog.created_at, AuditLog.id)
+    # 使用 Core 查詢搭配伺服器端 cursor：不建立 ORM 物件，記憶體只保留一批資料
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(query)
+        for rows in result.partitions():
+            yield render(rows)
+
+
+def stream_audit_export(
+    filters: list[ColumnElement[bool]],
+    fmt: ExportFormat,
+    *,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """逐批產生匯出內容；compress 時輸出 gzip 串流（zlib wbits=31）"""
+    if not compress:
+        for chunk in _text_chunks(filters, fmt):
+            yield chunk.encode()
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in _text_chunks(filters, fmt):
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Literal
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import get_settings
+from app.db.locks import advisory_unlock, try_advisory_lock
+from app.db.session import async_engine
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PARENT_TABLE = "audit_logs"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+LOCK_NAME = "audit_partitions"
+PARTITION_PATTERN = re.compile(r"^audit_logs_p(\d{4})(\d{2})$")
+
+RetentionMode = Literal["detach", "drop"]
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+@dataclass
+class MaintenanceReport:
+    created: list[str] = field(default_factory=list)
+    detached: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    # 建立分割時從 default 分割搬入的列數
+    moved: dict[str, int] = field(default_factory=dict)
+    failed: list[str] = field(default_factory=list)
+    # 其他 worker 正在維護，本次未執行
+    skipped: bool = False
+
+
+async def list_partitions(conn: AsyncConnection) -> dict[date, str]:
+    """目前掛在 audit_logs 底下的月份分割（不含 default）"""
+    result = await conn.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    partitions: dict[date, str] = {}
+    for (name,) in result:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def _bounds(month: date) -> tuple[datetime, datetime]:
+    next_month = add_months(month, 1)
+    return (
+        datetime(month.year, month.month, 1, tzinfo=timezone.utc),
+        datetime(next_month.year, next_month.month, 1, tzinfo=timezone.utc),
+    )
+
+
+async def create_partition(conn: AsyncConnection, month: date, *, dry_run: bool = False) -> int:
+    """建立單一月份分割，回傳從 default 分割搬入的列數。
+
+    default 分割若已有該月資料（例如先前分割未建好時寫入），直接 CREATE ... PARTITION OF 會失敗；
+    此時先建立獨立資料表、把資料從 default 搬過去，再 ATTACH。
+    先鎖住父表阻擋寫入（與 INSERT 相同的上鎖順序），避免檢查與建立之間又有資料落入 default。
+    """
+    name = partition_name(month)
+    start, end = _bounds(month)
+    values = (
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+    in_range = {"start": start, "end": end}
+    if dry_run:
+        return await conn.scalar(
+            text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end"),
+            in_range,
+        )
+
+    await conn.execute(text(f"LOCK TABLE ONLY {PARENT_TABLE} IN SHARE ROW EXCLUSIVE MODE"))
+    stray = await conn.scalar(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end)"),
+        in_range,
+    )
+    if not stray:
+        await conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} {values}"))
+        return 0
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    result = await conn.execute(
+        text(
+            f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+            """
+        ),
+        in_range,
+    )
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} {values}"))
+    return result.rowcount
+
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    report: MaintenanceReport,
+    *,
+    months_ahead: int,
+    today: date | None = None,
+    dry_run: bool = False,
+) -> None:
+    """預先建立本月起算 months_ahead 個月的分割，避免資料落入 default 分割；每個分割各自一個交易"""
+    current = month_start(today or datetime.now(tz=timezone.utc))
+    async with conn.begin():
+        existing = await list_partitions(conn)
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        name = partition_name(month)
+        try:
+            async with conn.begin():
+                moved = await create_partition(conn, month, dry_run=dry_run)
+        except Exception:
+            logger.exception("Failed to create audit partition %s", name)
+            report.failed.append(name)
+            continue
+        report.created.append(name)
+        if moved:
+            report.moved[name] = moved
+
+
+async def apply_retention(
+    conn: AsyncConnection,
+    report: MaintenanceReport,
+    *,
+    retention_months: int,
+    mode: RetentionMode,
+    today: date | None = None,
+    dry_run: bool = False,
+) -> None:
+    """整個月份分割超過保留期時直接卸離或刪除，不對大表做 DELETE（不產生 dead tuple）。
+
+    detach 模式保留為獨立資料表供備份封存後自行刪除。retention_months <= 0 表示不清理。
+    每個分割各自一個交易，單一分割失敗不影響其他分割。
+    """
+    if retention_months <= 0:
+        return
+    cutoff = add_months(month_start(today or datetime.now(tz=timezone.utc)), -retention_months)
+    async with conn.begin():
+        partitions = await list_partitions(conn)
+    expired = report.dropped if mode == "drop" else report.detached
+    for month, name in sorted(partitions.items()):
+        if add_months(month, 1) > cutoff:
+            continue
+        if not dry_run:
+            try:
+                async with conn.begin():
+                    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                    if mode == "drop":
+                        await conn.execute(text(f"DROP TABLE {name}"))
+            except Exception:
+                logger.exception("Failed to %s audit partition %s", mode, name)
+                report.failed.append(name)
+                continue
+        expired.append(name)
+
+
+async def maintain_audit_partitions(
+    *,
+    months_ahead: int | None = None,
+    retention_months: int | None = None,
+    mode: RetentionMode | None = None,
+    dry_run: bool = False,
+) -> MaintenanceReport:
+    months_ahead = settings.audit_partition_months_ahead if months_ahead is None else months_ahead
+    retention_months = settings.audit_retention_months if retention_months is None else retention_months
+    mode = mode or settings.audit_retention_mode
+
+    report = MaintenanceReport()
+    async with async_engine.connect() as conn:
+        # 每個 worker 都會排程維護：只讓取得鎖的一個執行，避免同時建立、DETACH 或 DROP 同一個分割
+        locked = await try_advisory_lock(conn, LOCK_NAME)
+        await conn.commit()
+        if not locked:
+            report.skipped = True
+            return report
+        try:
+            await ensure_partitions(conn, report, months_ahead=months_ahead, dry_run=dry_run)
+            await apply_retention(conn, report, retention_months=retention_months, mode=mode, dry_run=dry_run)
+        finally:
+            await advisory_unlock(conn, LOCK_NAME)
+            await conn.commit()
+    if not dry_run and (report.created or report.detached or report.dropped or report.failed):
+        logger.info(
+            "Audit partitions maintained: created=%s moved=%s detached=%s dropped=%s failed=%s",
+            report.created,
+            report.moved,
+            report.detached,
+            report.dropped,
+            report.failed,
+        )
+    return report
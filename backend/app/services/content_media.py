@@ -1,22 +1,85 @@
 from __future__ import annotations
 
 import re
+import uuid
 
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.orm import Session
 
 from app.models.media_file import ContentMedia, MediaFile
+from app.services.storage import storage
 
 IMAGE_PATTERN = re.compile(r'src=["\'](/uploads/[^"\']+)["\']')
 
 
-def sync_content_media(db: Session, content_id: int, html: str | None) -> None:
-    db.query(ContentMedia).filter(ContentMedia.content_id == content_id).delete(synchronize_session=False)
+def extract_media_urls(html: str | None) -> set[str]:
     if not html:
-        return
-    urls = {match.group(1) for match in IMAGE_PATTERN.finditer(html)}
-    if not urls:
-        return
-    media_items = db.query(MediaFile).filter(MediaFile.url.in_(urls)).all()
-    for media in media_items:
-        link = ContentMedia(content_id=content_id, media_id=media.id)
-        db.add(link)
+        return set()
+    return {match.group(1) for match in IMAGE_PATTERN.finditer(html)}
+
+
+def _adjust_usage(db: Session, media_ids: set[uuid.UUID], delta: int) -> None:
+    db.execute(
+        update(MediaFile)
+        .where(MediaFile.id.in_(media_ids))
+        .values(usage_count=MediaFile.usage_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def sync_content_media(db: Session, content_id: int, html: str | None) -> None:
+    """以差集增量同步內容引用的媒體：過期連結一次 DELETE、新增連結一次批次 INSERT，未變動的列不碰。
+
+    MediaFile.usage_count 在同一個交易中跟著增減。
+    """
+    # 內文中可能仍是搬移到分層目錄前的平面 URL，兩種寫法都要對得到
+    urls = {alias for url in extract_media_urls(html) for alias in storage.url_aliases(url)}
+    wanted: set[uuid.UUID] = set()
+    if urls:
+        wanted = set(db.scalars(select(MediaFile.id).where(MediaFile.url.in_(urls))))
+    current = set(db.scalars(select(ContentMedia.media_id).where(ContentMedia.content_id == content_id)))
+
+    stale = current - wanted
+    if stale:
+        db.execute(
+            delete(ContentMedia)
+            .where(ContentMedia.content_id == content_id, ContentMedia.media_id.in_(stale))
+            .execution_options(synchronize_session=False)
+        )
+        _adjust_usage(db, stale, -1)
+    added = wanted - current
+    if added:
+        db.execute(insert(ContentMedia), [{"content_id": content_id, "media_id": media_id} for media_id in added])
+        _adjust_usage(db, added, 1)
+
+
+def sync_content_media_state(db: Session, content_id: int, html: str | None, *, is_deleted: bool) -> None:
+    """依內容目前的狀態同步：封存的內容不保留媒體引用（不計入 usage_count），還原時依內文重新連結"""
+    sync_content_media(db, content_id, None if is_deleted else html)
+
+
+def _actual_usage():
+    return select(func.count(ContentMedia.id)).where(ContentMedia.media_id == MediaFile.id).scalar_subquery()
+
+
+def find_usage_drift(db: Session) -> list[tuple[uuid.UUID, int, int]]:
+    """列出 usage_count 與 content_media 實際引用數不一致的媒體：(id, 記錄值, 實際值)"""
+    actual = _actual_usage()
+    rows = db.execute(
+        select(MediaFile.id, MediaFile.usage_count, actual)
+        .where(MediaFile.usage_count != actual)
+        .order_by(MediaFile.id)
+    )
+    return [(media_id, recorded, counted) for media_id, recorded, counted in rows]
+
+
+def repair_usage_counts(db: Session) -> int:
+    """依 content_media 重新計算不一致的 usage_count，回傳修正的筆數（由呼叫端 commit）"""
+    actual = _actual_usage()
+    result = db.execute(
+        update(MediaFile)
+        .where(MediaFile.usage_count != actual)
+        .values(usage_count=actual)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import re
+
+from sqlalchemy import ColumnElement, Text, and_, cast, func, or_
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG
+
+from app.models.content import CJK_CLASS, Content
+
+SEARCH_CONFIG = "simple"
+TERM_PATTERN = re.compile(r"\w+")
+# 中日韓文字：'simple' 設定會把連續的 CJK 字串當成單一詞彙，詞中的片段無法以 tsquery 命中
+CJK_PATTERN = re.compile(CJK_CLASS)
+
+
+def contains_cjk(search: str) -> bool:
+    return CJK_PATTERN.search(search) is not None
+
+
+def term_ngrams(term: str) -> list[str]:
+    """與 content_ngrams 相同規則的 n-gram：單字的詞用單字，其餘用含 CJK 的雙字"""
+    term = term.lower()
+    if len(term) == 1:
+        grams = {term}
+    else:
+        grams = {term[index : index + 2] for index in range(len(term) - 1)}
+    return sorted(gram for gram in grams if CJK_PATTERN.search(gram))
+
+
+def substring_filter(search: str) -> ColumnElement | None:
+    """含 CJK 的查詢以子字串比對標題、slug 與標籤（以空白分隔的每個詞都需命中）。
+
+    含 CJK 的詞先以 search_ngrams 的 GIN 索引篩選（1 個字以上都適用），再以 ILIKE 確認字元順序；
+    不含 CJK 的詞（例如中英混合查詢中的英文）只以 ILIKE 比對，由同一查詢中其他詞的索引條件縮小範圍。
+    """
+    terms = search.split()
+    if not terms:
+        return None
+    conditions = []
+    for term in terms:
+        condition = or_(
+            Content.title.icontains(term, autoescape=True),
+            Content.slug.icontains(term, autoescape=True),
+            Content.tags.icontains(term, autoescape=True),
+        )
+        grams = term_ngrams(term)
+        if grams:
+            condition = and_(Content.search_ngrams.contains(cast(grams, ARRAY(Text))), condition)
+        conditions.append(condition)
+    return and_(*conditions)
+
+
+def build_search_query(search: str) -> ColumnElement | None:
+    """把使用者輸入轉為前綴比對的 tsquery（每個詞都需命中），只保留字詞字元以避免 tsquery 語法錯誤"""
+    terms = TERM_PATTERN.findall(search.lower())
+    if not terms:
+        return None
+    return func.to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), " & ".join(f"{term}:*" for term in terms))
+
+
+def search_filter(ts_query: ColumnElement) -> ColumnElement:
+    return Content.search_vector.op("@@")(ts_query)
+
+
+def search_rank(ts_query: ColumnElement) -> ColumnElement:
+    return func.ts_rank_cd(Content.search_vector, ts_query)
+
+
+def search_condition(search: str) -> tuple[ColumnElement | None, ColumnElement | None]:
+    """回傳 (篩選條件, 排序用的 tsquery)；含 CJK 的查詢走子字串比對，沒有 tsquery 可排序。
+    篩選條件為 None 表示查詢中沒有可比對的字詞"""
+    if contains_cjk(search):
+        return substring_filter(search), None
+    ts_query = build_search_query(search)
+    if ts_query is None:
+        return None, None
+    return search_filter(ts_query), ts_query
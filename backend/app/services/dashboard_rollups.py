@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from datetime import date, datetime, time, timezone
+from typing import Any
+
+from sqlalchemy import Date, Insert, cast, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.session import async_engine
+from app.models.audit_log import AuditLog
+from app.models.content import Content
+from app.models.dashboard import AuditDailyCount, DashboardCounter
+from app.models.user import User
+
+
+def audit_daily_count_stmt(rows: Iterable[Mapping[str, Any]]) -> Insert | None:
+    """把一批稽核紀錄累加到每日彙總；需與 INSERT audit_logs 在同一個交易執行，兩者一起 commit 或 rollback"""
+    counts = Counter((row["created_at"].astimezone(timezone.utc).date(), row["action"]) for row in rows)
+    if not counts:
+        return None
+    # 依 (day, action) 排序，並行的交易以相同順序鎖定資料列，避免 deadlock
+    stmt = pg_insert(AuditDailyCount).values(
+        [{"day": day, "action": action, "count": count} for (day, action), count in sorted(counts.items())]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[AuditDailyCount.day, AuditDailyCount.action],
+        set_={"count": AuditDailyCount.count + stmt.excluded.count},
+    )
+
+
+def counter_delta_stmt(name: str, delta: int) -> Insert:
+    """調整 Dashboard 計數；與新增 / 封存資料的交易一起 commit"""
+    stmt = pg_insert(DashboardCounter).values(name=name, value=delta, updated_at=datetime.now(tz=timezone.utc))
+    return stmt.on_conflict_do_update(
+        index_elements=[DashboardCounter.name],
+        set_={"value": DashboardCounter.value + stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+    )
+
+
+async def rebuild_audit_daily_counts(conn: AsyncConnection, since_day: date | None) -> None:
+    day = cast(func.timezone(literal_column("'UTC'"), AuditLog.created_at), Date)
+    counts = select(day, AuditLog.action, func.count()).group_by(day, AuditLog.action)
+    if since_day is not None:
+        counts = counts.where(AuditLog.created_at >= datetime.combine(since_day, time.min, tzinfo=timezone.utc))
+    stmt = pg_insert(AuditDailyCount).from_select(["day", "action", "count"], counts)
+    await conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[AuditDailyCount.day, AuditDailyCount.action],
+            set_={"count": stmt.excluded.count},
+        )
+    )
+
+
+async def rebuild_dashboard_counters(conn: AsyncConnection) -> None:
+    now = datetime.now(tz=timezone.utc)
+    stmt = pg_insert(DashboardCounter).values(
+        [
+            {"name": "members", "value": select(func.count(User.id)).scalar_subquery(), "updated_at": now},
+            {
+                "name": "contents",
+                "value": select(func.count(Content.id)).where(Content.is_deleted.is_(False)).scalar_subquery(),
+                "updated_at": now,
+            },
+        ]
+    )
+    await conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[DashboardCounter.name],
+            set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+        )
+    )
+
+
+async def rebuild_dashboard_rollups(since_day: date | None = None) -> None:
+    """以全表計數校正彙總表（平時由寫入路徑累加，不需定期執行）。
+
+    先鎖定彙總表再計數：尚未 commit 的寫入會等到校正結束才累加，已 commit 的則已含在計數內，兩者不會重複或遺漏。
+    """
+    async with async_engine.begin() as conn:
+        await conn.execute(text("LOCK TABLE audit_daily_counts, dashboard_counters IN EXCLUSIVE MODE"))
+        await rebuild_audit_daily_counts(conn, since_day)
+        await rebuild_dashboard_counters(conn)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import pathlib
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from sqlalchemy import update
+
+from app.core.config import get_settings
+from app.db.session import async_engine
+from app.models.media_file import MediaFile
+from app.services.storage import storage
+from app.utils.images import ImageTooLarge, render_derivatives, underivable
+
+logger = logging.getLogger(__name__)
+
+# 可產生衍生檔的原圖格式
+DERIVABLE_CONTENT_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+# Accept 標頭中的格式偏好順序
+ACCEPT_PREFERENCE = (("image/avif", "avif"), ("image/webp", "webp"))
+FALLBACK_FORMATS = ("jpeg", "png")
+
+
+class ImagePipeline:
+    """上傳後在獨立 process pool 產生縮圖、WebP/AVIF 與 LQIP，完成後回寫 MediaFile，不佔用請求路徑"""
+
+    def __init__(self, *, workers: int, max_pixels: int) -> None:
+        self.workers = workers
+        self.max_pixels = max_pixels
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def schedule(self, media_id: uuid.UUID, filename: str) -> None:
+        task = asyncio.create_task(self.process(media_id, filename), name=f"image_derivatives:{media_id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def process(self, media_id: uuid.UUID, filename: str) -> None:
+        source = storage.path_for(filename)
+        try:
+            future = self._get_executor().submit(
+                render_derivatives,
+                str(source),
+                str(storage.root),
+                derivative_stem(filename),
+                max_pixels=self.max_pixels,
+            )
+            result = await asyncio.wrap_future(future)
+        except ImageTooLarge as exc:
+            logger.warning(
+                "Skipping derivatives for %s: %dx%d exceeds image_max_pixels", filename, exc.width, exc.height
+            )
+            result = underivable(exc.width, exc.height)
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            logger.exception("Image worker crashed while processing %s", filename)
+            return
+        except Exception:
+            logger.exception("Failed to render derivatives for %s", filename)
+            return
+
+        async with async_engine.begin() as conn:
+            await conn.execute(
+                update(MediaFile)
+                .where(MediaFile.id == media_id)
+                .values(
+                    width=result["width"],
+                    height=result["height"],
+                    lqip=result["lqip"],
+                    variants=result["variants"],
+                )
+            )
+
+
+def derivative_stem(filename: str) -> str:
+    """衍生檔與原檔放在同一個目錄：以不含副檔名的 key 當作檔名前綴"""
+    return str(pathlib.PurePosixPath(filename).with_suffix(""))
+
+
+def needs_derivatives(media: MediaFile) -> bool:
+    return media.content_type in DERIVABLE_CONTENT_TYPES and media.width is None
+
+
+def variant_filenames(media: MediaFile) -> list[str]:
+    return [
+        filename
+        for variant in (media.variants or {}).values()
+        for filename in variant.get("formats", {}).values()
+    ]
+
+
+def choose_variant(media: MediaFile, width: int | None, accept: str) -> str:
+    """依需要的寬度與瀏覽器 Accept 標頭挑選最合適的檔案；沒有合適的衍生檔時回傳原檔"""
+    variants = sorted((media.variants or {}).values(), key=lambda variant: variant["width"])
+    if not variants or width is None or (media.width and width >= media.width):
+        return media.filename
+    chosen = next((variant for variant in variants if variant["width"] >= width), None)
+    if chosen is None:
+        return media.filename
+    formats = chosen["formats"]
+    accept = accept.lower()
+    for media_type, fmt in ACCEPT_PREFERENCE:
+        if media_type in accept and fmt in formats:
+            return formats[fmt]
+    for fmt in FALLBACK_FORMATS:
+        if fmt in formats:
+            return formats[fmt]
+    return media.filename
+
+
+_settings = get_settings()
+image_pipeline = ImagePipeline(workers=_settings.image_workers, max_pixels=_settings.image_max_pixels)
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import anyio.to_thread
+from sqlalchemy import and_, delete, exists, or_, select
+
+from app.core.config import get_settings
+from app.db.session import async_engine
+from app.models.content import Content
+from app.models.media_file import ContentMedia, MediaFile
+from app.services.storage import storage
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# 與原檔一起刪除的預壓縮版本
+SIDECAR_SUFFIXES = (".br", ".gz")
+# 比對磁碟與資料庫時每次讀取的列數
+VERIFY_BATCH_SIZE = 5000
+
+
+@dataclass
+class MediaGcReport:
+    dry_run: bool
+    scanned: int = 0
+    deleted: int = 0
+    reclaimed_bytes: int = 0
+    kept_as_cover: int = 0
+    orphan_files: list[str] = field(default_factory=list)
+    missing_files: list[str] = field(default_factory=list)
+    orphan_files_deleted: int = 0
+    orphan_bytes_reclaimed: int = 0
+
+
+@dataclass
+class MediaGcMetrics:
+    """此 worker 累計的 GC 統計（每個 worker 各自執行 GC，數字不跨 process 彙總）"""
+
+    runs: int = 0
+    deleted_total: int = 0
+    reclaimed_bytes_total: int = 0
+    last_run_at: datetime | None = None
+    last_duration_seconds: float | None = None
+    last_report: MediaGcReport | None = None
+
+
+media_gc_metrics = MediaGcMetrics()
+
+
+def _media_filenames(filename: str, variants: dict | None) -> list[str]:
+    """媒體在磁碟上的所有檔案：原檔、預壓縮版本與衍生檔"""
+    names = [filename, *(f"{filename}{suffix}" for suffix in SIDECAR_SUFFIXES)]
+    for variant in (variants or {}).values():
+        names.extend(variant.get("formats", {}).values())
+    return names
+
+
+def _remove_files(filenames: list[str], *, dry_run: bool) -> int:
+    """刪除（dry-run 時只計算）檔案，回傳釋放的 bytes；不存在的檔案略過"""
+    reclaimed = 0
+    for filename in filenames:
+        path = storage.path_for(filename)
+        try:
+            size = path.stat().st_size
+            if not dry_run:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError:
+            logger.warning("Failed to remove media file %s", path, exc_info=True)
+            continue
+        reclaimed += size
+    return reclaimed
+
+
+async def collect_orphan_media(
+    report: MediaGcReport,
+    *,
+    grace: timedelta,
+    batch_size: int,
+    max_deletes: int,
+    pause_seconds: float,
+) -> None:
+    """分批刪除沒有任何內容引用、且最近一次上傳已超過寬限期的媒體列與檔案。
+
+    寬限期以 last_uploaded_at 計算：重複上傳相同內容時會更新此欄，剛拿到既有 URL 的編輯不會被 GC 搶先刪除。
+    每批是獨立的短交易：以 FOR UPDATE SKIP LOCKED 只鎖定候選列，正被上傳、刪除或計數更新的列直接跳過，
+    不鎖整張表；列刪除並 commit 後才刪檔案（刪檔失敗只會留下孤兒檔，下次比對磁碟時可發現）。
+    """
+    cutoff = datetime.now(tz=timezone.utc) - grace
+    position: tuple[datetime, object] | None = None
+    while report.deleted < max_deletes:
+        async with async_engine.begin() as conn:
+            query = (
+                select(MediaFile.id, MediaFile.url, MediaFile.filename, MediaFile.variants, MediaFile.last_uploaded_at)
+                .where(
+                    MediaFile.usage_count == 0,
+                    MediaFile.last_uploaded_at < cutoff,
+                    ~exists().where(ContentMedia.media_id == MediaFile.id),
+                )
+                .order_by(MediaFile.last_uploaded_at, MediaFile.id)
+                .limit(min(batch_size, max_deletes - report.deleted))
+                .with_for_update(skip_locked=True)
+            )
+            if position is not None:
+                query = query.where(
+                    or_(
+                        MediaFile.last_uploaded_at > position[0],
+                        and_(MediaFile.last_uploaded_at == position[0], MediaFile.id > position[1]),
+                    )
+                )
+            rows = (await conn.execute(query)).all()
+            if not rows:
+                break
+            position = (rows[-1].last_uploaded_at, rows[-1].id)
+            report.scanned += len(rows)
+
+            # 封面圖不經由 content_media 追蹤，另外排除仍被未刪除內容當作封面的媒體（含搬移前的平面 URL）
+            candidates = {alias for row in rows for alias in storage.url_aliases(row.url)}
+            covers = {
+                alias
+                for cover in (
+                    await conn.execute(
+                        select(Content.cover_image_url).where(
+                            Content.cover_image_url.in_(candidates),
+                            Content.is_deleted.is_(False),
+                        )
+                    )
+                ).scalars()
+                for alias in storage.url_aliases(cover)
+            }
+            doomed = [row for row in rows if row.url not in covers]
+            report.kept_as_cover += len(rows) - len(doomed)
+            if doomed and not report.dry_run:
+                await conn.execute(delete(MediaFile).where(MediaFile.id.in_([row.id for row in doomed])))
+
+        reused: set[str] = set()
+        if doomed and not report.dry_run:
+            # 列刪除後、刪檔前，相同內容可能已重新上傳成新的一列並沿用同一個檔名：這些檔案保留
+            async with async_engine.connect() as conn:
+                result = await conn.execute(
+                    select(MediaFile.filename).where(MediaFile.filename.in_([row.filename for row in doomed]))
+                )
+                reused = set(result.scalars())
+        filenames = [
+            name
+            for row in doomed
+            if row.filename not in reused
+            for name in _media_filenames(row.filename, row.variants)
+        ]
+        report.reclaimed_bytes += await anyio.to_thread.run_sync(
+            lambda: _remove_files(filenames, dry_run=report.dry_run)
+        )
+        report.deleted += len(doomed)
+        if len(rows) < batch_size:
+            break
+        # 限速：批次之間暫停，避免 GC 佔滿磁碟 IO 與連線
+        await asyncio.sleep(pause_seconds)
+
+
+def _scan_storage(older_than: float) -> dict[str, int]:
+    """列出 storage 中修改時間早於 older_than 的檔案（相對路徑 → 大小），略過以 . 開頭的暫存目錄與檔案"""
+    found: dict[str, int] = {}
+    root = storage.root
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+        for name in filenames:
+            if name.startswith("."):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            if info.st_mtime < older_than:
+                found[os.path.relpath(path, root).replace(os.sep, "/")] = info.st_size
+    return found
+
+
+async def verify_storage(report: MediaGcReport, *, grace: timedelta, delete_orphan_files: bool) -> None:
+    """比對磁碟與 media_files：找出沒有對應列的檔案，以及檔案已遺失的列。
+
+    上傳流程先放檔案再寫入資料列，因此只檢查超過寬限期的檔案；遺失檔案的列只回報不刪除。
+    """
+    older_than = time.time() - grace.total_seconds()
+    on_disk = await anyio.to_thread.run_sync(_scan_storage, older_than)
+    remaining = dict(on_disk)
+
+    last_id = None
+    while True:
+        async with async_engine.connect() as conn:
+            query = (
+                select(MediaFile.id, MediaFile.filename, MediaFile.variants)
+                .order_by(MediaFile.id)
+                .limit(VERIFY_BATCH_SIZE)
+            )
+            if last_id is not None:
+                query = query.where(MediaFile.id > last_id)
+            rows = (await conn.execute(query)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            for name in _media_filenames(row.filename, row.variants):
+                remaining.pop(name, None)
+        missing = [row.filename for row in rows if row.filename not in on_disk]
+        if missing:
+            # 新上傳（寬限期內）的檔案不在 on_disk 中，需再確認一次是否真的不存在
+            exists_flags = await anyio.to_thread.run_sync(
+                lambda: [storage.path_for(name).exists() for name in missing]
+            )
+            report.missing_files.extend(name for name, found in zip(missing, exists_flags) if not found)
+
+    report.orphan_files = sorted(remaining)
+    if delete_orphan_files and not report.dry_run and remaining:
+        report.orphan_bytes_reclaimed = await anyio.to_thread.run_sync(
+            lambda: _remove_files(report.orphan_files, dry_run=False)
+        )
+        report.orphan_files_deleted = len(report.orphan_files)
+    elif delete_orphan_files:
+        report.orphan_bytes_reclaimed = sum(remaining.values())
+
+
+async def run_media_gc(
+    *,
+    dry_run: bool = False,
+    verify: bool | None = None,
+    delete_orphan_files: bool = False,
+    grace_hours: float | None = None,
+    batch_size: int | None = None,
+    max_deletes: int | None = None,
+) -> MediaGcReport:
+    grace = timedelta(hours=settings.media_gc_grace_hours if grace_hours is None else grace_hours)
+    verify = settings.media_gc_verify_storage if verify is None else verify
+    started = time.monotonic()
+
+    report = MediaGcReport(dry_run=dry_run)
+    await collect_orphan_media(
+        report,
+        grace=grace,
+        batch_size=batch_size or settings.media_gc_batch_size,
+        max_deletes=settings.media_gc_max_deletes_per_run if max_deletes is None else max_deletes,
+        pause_seconds=settings.media_gc_batch_pause_seconds,
+    )
+    if verify:
+        await verify_storage(report, grace=grace, delete_orphan_files=delete_orphan_files)
+
+    media_gc_metrics.runs += 1
+    media_gc_metrics.last_run_at = datetime.now(tz=timezone.utc)
+    media_gc_metrics.last_duration_seconds = round(time.monotonic() - started, 3)
+    media_gc_metrics.last_report = report
+    if not dry_run:
+        media_gc_metrics.deleted_total += report.deleted + report.orphan_files_deleted
+        media_gc_metrics.reclaimed_bytes_total += report.reclaimed_bytes + report.orphan_bytes_reclaimed
+    if report.deleted or report.orphan_files or report.missing_files:
+        logger.info(
+            "Media GC%s: deleted=%d reclaimed_bytes=%d orphan_files=%d missing_files=%d",
+            " (dry-run)" if dry_run else "",
+            report.deleted,
+            report.reclaimed_bytes,
+            len(report.orphan_files),
+            len(report.missing_files),
+        )
+    return report
+
+
+async def collect_media_garbage() -> None:
+    """背景任務進入點"""
+    await run_media_gc()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import get_settings
+from app.models.user import User, UserRole
+from app.utils.cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPrincipal:
+    id: uuid.UUID
+    email: str
+    name: str
+    role: UserRole
+    is_active: bool
+    token_version: int
+    force_logout_flag: bool
+    last_device_id: str | None
+    last_login_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedPrincipal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            is_active=bool(user.is_active),
+            token_version=user.token_version,
+            force_logout_flag=bool(user.force_logout_flag),
+            last_device_id=user.last_device_id,
+            last_login_at=user.last_login_at,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+    def to_user(self) -> User:
+        # 每個請求拿到獨立的 detached 物件，避免跨 session 共用同一個 ORM instance；
+        # 未快取的欄位（例如 password_hash）在掛回 session 後才會 lazy load。
+        user = User(**asdict(self))
+        make_transient_to_detached(user)
+        return user
+
+
+class PrincipalCache:
+    """以 (user id, token_version) 對應的登入者快取，命中時不需查詢 users 表"""
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self._cache: TTLCache[uuid.UUID, CachedPrincipal] = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, user_id: uuid.UUID, token_version: int) -> User | None:
+        principal = self._cache.get(user_id)
+        if principal is None or principal.token_version != token_version:
+            return None
+        return principal.to_user()
+
+    def put(self, user: User) -> None:
+        self._cache.set(user.id, CachedPrincipal.from_user(user))
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        self._cache.pop(user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+_settings = get_settings()
+principal_cache = PrincipalCache(
+    max_size=_settings.principal_cache_max_size,
+    ttl=_settings.principal_cache_ttl_seconds,
+)
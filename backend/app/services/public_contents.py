@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.models.content import Content, ContentStatus
+from app.schemas.content import PublicContentDetail, PublicContentSummary
+
+MAX_RENDERED_RESPONSES = 512
+
+_summary_list = TypeAdapter(list[PublicContentSummary])
+# 列表只需要摘要欄位，不載入 body
+_summary_columns = load_only(*(getattr(Content, name) for name in PublicContentSummary.model_fields))
+
+
+def _published():
+    return select(Content).where(Content.status == ContentStatus.PUBLISHED, Content.is_deleted.is_(False))
+
+
+def _sort_key(item: PublicContentSummary) -> tuple:
+    return item.created_at, item.id
+
+
+@dataclass(frozen=True)
+class RenderedResponse:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, body: bytes) -> RenderedResponse:
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+@dataclass
+class PublishedSnapshot:
+    """某個時間點已發布內容的摘要列表（不含內文）；回應的 JSON 以查詢參數為 key 快取在快照內"""
+
+    latest: list[PublicContentSummary]
+    built_at: float = field(default_factory=time.monotonic)
+    slugs: frozenset[str] = field(init=False)
+    by_id: dict[int, PublicContentSummary] = field(init=False)
+    _rendered: dict[tuple, RenderedResponse] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.slugs = frozenset(item.slug for item in self.latest)
+        self.by_id = {item.id: item for item in self.latest}
+
+    def list_contents(self, category_id: int | None, skip: int, limit: int) -> RenderedResponse:
+        def render() -> bytes:
+            items = self.latest
+            if category_id is not None:
+                items = [item for item in items if item.category_id == category_id]
+            return _summary_list.dump_json(items[skip : skip + limit])
+
+        return self._render(("list", category_id, skip, limit), render)
+
+    def get_summary(self, content_id: int) -> RenderedResponse | None:
+        item = self.by_id.get(content_id)
+        if item is None:
+            return None
+        return self._render(("id", content_id), item.model_dump_json().encode)
+
+    def _render(self, key: tuple, render: Callable[[], bytes]) -> RenderedResponse:
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            rendered = RenderedResponse.of(render())
+            if len(self._rendered) < MAX_RENDERED_RESPONSES:
+                self._rendered[key] = rendered
+        return rendered
+
+
+@dataclass(frozen=True)
+class _DetailEntry:
+    content_id: int
+    rendered: RenderedResponse
+    loaded_at: float
+
+
+class PublishedContentCache:
+    """已發布內容的 worker 內快取：摘要列表整份快照，內文依 slug 按需載入（LRU，有上限）。
+
+    invalidate(content_id) 只重載該筆內容的摘要並移除其內文快取；其他 worker 依 TTL 收斂。
+    """
+
+    def __init__(self, ttl: float, max_details: int) -> None:
+        self.ttl = ttl
+        self.max_details = max_details
+        self._snapshot: PublishedSnapshot | None = None
+        self._pending: set[int] = set()
+        self._details: OrderedDict[str, _DetailEntry] = OrderedDict()
+        # 每次 invalidate 遞增；載入期間若有異動，結果不寫回快取
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, content_id: int) -> None:
+        self._generation += 1
+        self._pending.add(content_id)
+        for slug in [slug for slug, entry in self._details.items() if entry.content_id == content_id]:
+            del self._details[slug]
+
+    def _is_expired(self, built_at: float) -> bool:
+        return time.monotonic() - built_at >= self.ttl
+
+    async def get(self) -> PublishedSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and not self._pending and not self._is_expired(snapshot.built_at):
+            return snapshot
+        async with self._lock:
+            if self._snapshot is None or self._is_expired(self._snapshot.built_at):
+                self._pending.clear()
+                self._snapshot = await self._build()
+            elif self._pending:
+                content_ids, self._pending = self._pending, set()
+                self._snapshot = await self._patch(self._snapshot, content_ids)
+            return self._snapshot
+
+    async def get_detail(self, slug: str) -> RenderedResponse | None:
+        snapshot = await self.get()
+        if slug not in snapshot.slugs:
+            return None
+        entry = self._details.get(slug)
+        if entry is not None and not self._is_expired(entry.loaded_at):
+            self._details.move_to_end(slug)
+            return entry.rendered
+
+        generation = self._generation
+        async with AsyncSessionLocal() as db:
+            content = (await db.execute(_published().where(Content.slug == slug))).scalar_one_or_none()
+            if content is None:
+                return None
+            detail = PublicContentDetail.model_validate(content)
+        rendered = RenderedResponse.of(detail.model_dump_json().encode())
+        if generation == self._generation:
+            self._details[slug] = _DetailEntry(content_id=detail.id, rendered=rendered, loaded_at=time.monotonic())
+            self._details.move_to_end(slug)
+            while len(self._details) > self.max_details:
+                self._details.popitem(last=False)
+        return rendered
+
+    async def _load_summaries(self, *conditions) -> list[PublicContentSummary]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(_published().where(*conditions).options(_summary_columns))
+            return [PublicContentSummary.model_validate(content) for content in result.scalars().all()]
+
+    async def _build(self) -> PublishedSnapshot:
+        items = await self._load_summaries()
+        items.sort(key=_sort_key, reverse=True)
+        return PublishedSnapshot(latest=items)
+
+    async def _patch(self, snapshot: PublishedSnapshot, content_ids: set[int]) -> PublishedSnapshot:
+        """只重載異動的內容；結果與原快照相同（例如草稿的異動）時沿用原快照與其回應快取"""
+        changed = await self._load_summaries(Content.id.in_(content_ids))
+        kept = [item for item in snapshot.latest if item.id not in content_ids]
+        if not changed and len(kept) == len(snapshot.latest):
+            return snapshot
+        items = kept + changed
+        items.sort(key=_sort_key, reverse=True)
+        return PublishedSnapshot(latest=items, built_at=snapshot.built_at)
+
+
+_settings = get_settings()
+published_contents = PublishedContentCache(
+    ttl=_settings.public_content_cache_seconds,
+    max_details=_settings.public_content_detail_cache_size,
+)
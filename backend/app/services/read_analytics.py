@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import and_, bindparam, delete, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import async_engine
+from app.models.analytics import ContentReadDaily, ContentReadWindow, ReadWindow
+from app.models.content import Content
+from app.utils.hyperloglog import HyperLogLog
+
+settings = get_settings()
+
+READ_CONTENT_ACTION = "read_content"
+EMPTY_READERS = HyperLogLog().to_bytes()
+# 新建的期間列一律視為過時，於同一個交易自每日資料重算
+STALE_START_DAY = date(1970, 1, 1)
+
+
+@dataclass
+class _DailyReads:
+    views: int = 0
+    readers: HyperLogLog = field(default_factory=HyperLogLog)
+
+
+class ReadAnalytics:
+    """worker 內累積 read_content 事件：每篇內容每日的閱讀次數與讀者 HyperLogLog，定期合併寫入 content_read_daily"""
+
+    def __init__(self) -> None:
+        self._pending: dict[tuple[int, date], _DailyReads] = {}
+        self._lock = threading.Lock()
+
+    def record(self, content_id: int, reader: str, at: datetime | None = None) -> None:
+        day = (at or datetime.now(tz=timezone.utc)).astimezone(timezone.utc).date()
+        with self._lock:
+            entry = self._pending.get((content_id, day))
+            if entry is None:
+                entry = self._pending[(content_id, day)] = _DailyReads()
+            entry.views += 1
+            entry.readers.add(reader)
+
+    def record_event(self, action: str, target_id: str | None, reader: str) -> None:
+        """追蹤事件的進入點；只處理 target_id 為內容 id 的 read_content"""
+        if action == READ_CONTENT_ACTION and target_id and target_id.isdigit():
+            self.record(int(target_id), reader)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _take(self) -> dict[tuple[int, date], _DailyReads]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _restore(self, pending: dict[tuple[int, date], _DailyReads]) -> None:
+        with self._lock:
+            for key, entry in pending.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = entry
+                else:
+                    current.views += entry.views
+                    current.readers.merge(entry.readers)
+
+    async def flush(self) -> int:
+        pending = self._take()
+        if not pending:
+            return 0
+        try:
+            async with async_engine.begin() as conn:
+                return await _merge_daily_reads(conn, pending)
+        except Exception:
+            # 寫入失敗時放回累積區，下次 flush 再試
+            self._restore(pending)
+            raise
+
+
+async def _merge_daily_reads(conn: AsyncConnection, pending: dict[tuple[int, date], _DailyReads]) -> int:
+    content_ids = {content_id for content_id, _ in pending}
+    existing = set((await conn.execute(select(Content.id).where(Content.id.in_(content_ids)))).scalars())
+    keys = sorted(key for key in pending if key[0] in existing)
+    if not keys:
+        return 0
+
+    # 先確保每列存在，再以 FOR UPDATE 鎖定後在應用端合併草圖，多個 worker 同時 flush 也不會互相覆蓋
+    await conn.execute(
+        pg_insert(ContentReadDaily)
+        .values([{"content_id": content_id, "day": day, "readers": EMPTY_READERS} for content_id, day in keys])
+        .on_conflict_do_nothing()
+    )
+    rows = await conn.execute(
+        select(ContentReadDaily.content_id, ContentReadDaily.day, ContentReadDaily.readers)
+        .where(tuple_(ContentReadDaily.content_id, ContentReadDaily.day).in_(keys))
+        .order_by(ContentReadDaily.content_id, ContentReadDaily.day)
+        .with_for_update()
+    )
+    updates = []
+    for content_id, day, readers in rows:
+        entry = pending[(content_id, day)]
+        sketch = HyperLogLog.from_bytes(readers)
+        sketch.merge(entry.readers)
+        updates.append(
+            {
+                "b_content_id": content_id,
+                "b_day": day,
+                "b_views": entry.views,
+                "b_readers": sketch.to_bytes(),
+                "b_unique_readers": sketch.count(),
+            }
+        )
+    await conn.execute(
+        update(ContentReadDaily)
+        .where(ContentReadDaily.content_id == bindparam("b_content_id"), ContentReadDaily.day == bindparam("b_day"))
+        .values(
+            views=ContentReadDaily.views + bindparam("b_views"),
+            readers=bindparam("b_readers"),
+            unique_readers=bindparam("b_unique_readers"),
+        ),
+        updates,
+    )
+    await _merge_window_reads(conn, {key: pending[key] for key in keys})
+    return len(updates)
+
+
+def _today() -> date:
+    return datetime.now(tz=timezone.utc).date()
+
+
+def _window_start(days: int, today: date | None = None) -> date:
+    return (today or _today()) - timedelta(days=days - 1)
+
+
+def _window_values(daily: list[tuple[date, int, bytes]], windows: list[int], today: date) -> dict[int, dict]:
+    """daily 須依日期由新到舊；各期間互相包含，依序累積合併一次即可取得每個期間的結果"""
+    windows = sorted(windows)
+    results: dict[int, dict] = {}
+    sketch = HyperLogLog()
+    views = 0
+
+    def emit(window: int) -> None:
+        results[window] = {
+            "start_day": _window_start(window, today),
+            "views": views,
+            "readers": sketch.to_bytes(),
+            "unique_readers": sketch.count(),
+        }
+
+    for day, day_views, readers in daily:
+        while windows and day < _window_start(windows[0], today):
+            emit(windows.pop(0))
+        if not windows:
+            break
+        sketch.merge(HyperLogLog.from_bytes(readers))
+        views += day_views
+    for window in windows:
+        emit(window)
+    return results
+
+
+async def _recompute_windows(conn: AsyncConnection, content_id: int, windows: list[int], today: date) -> dict[int, dict]:
+    """自每日資料重算；一次只讀一篇內容，最多 365 個草圖"""
+    daily = await conn.execute(
+        select(ContentReadDaily.day, ContentReadDaily.views, ContentReadDaily.readers)
+        .where(ContentReadDaily.content_id == content_id, ContentReadDaily.day >= _window_start(max(windows), today))
+        .order_by(ContentReadDaily.day.desc())
+    )
+    return _window_values(daily.all(), windows, today)
+
+
+_update_window = (
+    update(ContentReadWindow)
+    .where(
+        ContentReadWindow.content_id == bindparam("b_content_id"),
+        ContentReadWindow.window_days == bindparam("b_window_days"),
+    )
+    .values(
+        start_day=bindparam("b_start_day"),
+        views=bindparam("b_views"),
+        readers=bindparam("b_readers"),
+        unique_readers=bindparam("b_unique_readers"),
+    )
+)
+
+
+def _window_update(content_id: int, window_days: int, values: dict) -> dict:
+    return {"b_content_id": content_id, "b_window_days": window_days, **{f"b_{k}": v for k, v in values.items()}}
+
+
+async def _merge_window_reads(conn: AsyncConnection, pending: dict[tuple[int, date], _DailyReads]) -> None:
+    """把本次累積的閱讀併入各期間的彙總列；起日過時的列（含新建列）改自已更新的每日資料重算"""
+    today = _today()
+    content_ids = sorted({content_id for content_id, _ in pending})
+    await conn.execute(
+        pg_insert(ContentReadWindow)
+        .values(
+            [
+                {"content_id": content_id, "window_days": window, "start_day": STALE_START_DAY, "readers": EMPTY_READERS}
+                for content_id in content_ids
+                for window in ReadWindow
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+    rows = await conn.execute(
+        select(
+            ContentReadWindow.content_id,
+            ContentReadWindow.window_days,
+            ContentReadWindow.start_day,
+            ContentReadWindow.views,
+            ContentReadWindow.readers,
+        )
+        .where(ContentReadWindow.content_id.in_(content_ids))
+        .order_by(ContentReadWindow.content_id, ContentReadWindow.window_days)
+        .with_for_update()
+    )
+    pending_by_content: dict[int, list[tuple[date, _DailyReads]]] = {}
+    for (content_id, day), entry in pending.items():
+        pending_by_content.setdefault(content_id, []).append((day, entry))
+    stale: dict[int, list[int]] = {}
+    updates = []
+    for content_id, window_days, start_day, views, readers in rows:
+        start = _window_start(window_days, today)
+        if start_day != start:
+            stale.setdefault(content_id, []).append(window_days)
+            continue
+        sketch = HyperLogLog.from_bytes(readers)
+        for day, entry in pending_by_content[content_id]:
+            if day >= start:
+                sketch.merge(entry.readers)
+                views += entry.views
+        updates.append(
+            _window_update(
+                content_id,
+                window_days,
+                {"start_day": start, "views": views, "readers": sketch.to_bytes(), "unique_readers": sketch.count()},
+            )
+        )
+    for content_id, windows in stale.items():
+        for window_days, values in (await _recompute_windows(conn, content_id, windows, today)).items():
+            updates.append(_window_update(content_id, window_days, values))
+    await conn.execute(_update_window, updates)
+
+
+async def roll_read_windows(limit: int) -> int:
+    """日期推進後，把起日過時的期間彙總自每日資料重算（多個 worker 以 SKIP LOCKED 分攤）；期間內已無閱讀的列直接刪除"""
+    today = _today()
+    stale = or_(
+        *(
+            and_(ContentReadWindow.window_days == window, ContentReadWindow.start_day < _window_start(window, today))
+            for window in ReadWindow
+        )
+    )
+    async with async_engine.begin() as conn:
+        rows = await conn.execute(
+            select(ContentReadWindow.content_id, ContentReadWindow.window_days)
+            .where(stale)
+            .order_by(ContentReadWindow.content_id, ContentReadWindow.window_days)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        windows_by_content: dict[int, list[int]] = {}
+        for content_id, window_days in rows:
+            windows_by_content.setdefault(content_id, []).append(window_days)
+        updates = []
+        empty = []
+        for content_id, windows in windows_by_content.items():
+            for window_days, values in (await _recompute_windows(conn, content_id, windows, today)).items():
+                if values["views"]:
+                    updates.append(_window_update(content_id, window_days, values))
+                else:
+                    empty.append((content_id, window_days))
+        if updates:
+            await conn.execute(_update_window, updates)
+        if empty:
+            await conn.execute(
+                delete(ContentReadWindow).where(
+                    tuple_(ContentReadWindow.content_id, ContentReadWindow.window_days).in_(empty)
+                )
+            )
+    return len(updates) + len(empty)
+
+
+read_analytics = ReadAnalytics()
+
+
+async def flush_read_analytics() -> None:
+    await read_analytics.flush()
+    await roll_read_windows(settings.read_analytics_roll_batch_size)
+
+
+def top_contents(db: Session, *, days: ReadWindow, limit: int) -> list[dict]:
+    """讀取預先彙總的期間列：每篇內容一列，不需在請求時合併草圖"""
+    rows = (
+        db.query(ContentReadWindow.content_id, Content.title, ContentReadWindow.views, ContentReadWindow.unique_readers)
+        .join(Content, Content.id == ContentReadWindow.content_id)
+        .filter(ContentReadWindow.window_days == int(days), ContentReadWindow.views > 0)
+        .order_by(ContentReadWindow.views.desc(), ContentReadWindow.content_id)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {"content_id": content_id, "title": title, "views": views, "unique_readers": unique_readers}
+        for content_id, title, views, unique_readers in rows
+    ]
+
+
+def content_trend(db: Session, content_id: int, *, days: int) -> list[dict]:
+    since = _window_start(days)
+    rows = {
+        day: (views, unique_readers)
+        for day, views, unique_readers in db.query(
+            ContentReadDaily.day, ContentReadDaily.views, ContentReadDaily.unique_readers
+        ).filter(ContentReadDaily.content_id == content_id, ContentReadDaily.day >= since)
+    }
+    trend = []
+    for offset in range(days):
+        day = since + timedelta(days=offset)
+        views, unique_readers = rows.get(day, (0, 0))
+        trend.append({"day": day, "views": views, "unique_readers": unique_readers})
+    return trend
+
+
+def content_readers(db: Session, content_id: int, *, days: ReadWindow) -> tuple[int, int]:
+    """回傳期間內的 (閱讀次數, 不重複讀者估計值)；跨日讀者數已於 flush 時合併草圖，不會重複計算"""
+    row = (
+        db.query(ContentReadWindow.views, ContentReadWindow.unique_readers)
+        .filter(ContentReadWindow.content_id == content_id, ContentReadWindow.window_days == int(days))
+        .first()
+    )
+    return (row.views, row.unique_readers) if row else (0, 0)
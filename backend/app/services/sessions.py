@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Update, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.models.active_session import ActiveSession
+
+settings = get_settings()
+
+# 增量同步時往回重疊的時間，涵蓋 revoked_at 已寫入但交易較晚 commit 的情況
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class RevocationFilter:
+    """每個 worker 內的已撤銷 jti 集合，由 active_sessions 增量同步"""
+
+    def __init__(self, token_lifetime: timedelta) -> None:
+        self.token_lifetime = token_lifetime
+        self._revoked: dict[str, float] = {}
+        self._watermark: datetime | None = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jwt_id: str) -> bool:
+        return jwt_id in self._revoked
+
+    def add_many(self, rows: Iterable[tuple[str, datetime | None]]) -> None:
+        """rows 為 (jwt_id, issued_at)；token 過期後即可從集合中移除"""
+        now = time.time()
+        with self._lock:
+            for jwt_id, issued_at in rows:
+                issued = issued_at.timestamp() if issued_at else now
+                self._revoked[jwt_id] = issued + self.token_lifetime.total_seconds()
+
+    def prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            self._revoked = {jwt_id: exp for jwt_id, exp in self._revoked.items() if exp > now}
+
+    async def refresh(self, db: AsyncSession) -> None:
+        now = datetime.now(tz=timezone.utc)
+        since = self._watermark - REFRESH_OVERLAP if self._watermark else now - self.token_lifetime
+        result = await db.execute(
+            select(ActiveSession.jwt_id, ActiveSession.issued_at).where(
+                ActiveSession.revoked.is_(True),
+                ActiveSession.revoked_at >= since,
+            )
+        )
+        self.add_many(result.all())
+        self._watermark = now
+        self.prune()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revocation_filter = RevocationFilter(timedelta(minutes=settings.jwt_expire_minutes))
+
+
+async def refresh_revocation_filter() -> None:
+    async with AsyncSessionLocal() as db:
+        await revocation_filter.refresh(db)
+
+
+def new_session(user_id: uuid.UUID, device_id: str) -> ActiveSession:
+    return ActiveSession(user_id=user_id, device_id=device_id, jwt_id=uuid.uuid4().hex)
+
+
+def revoke_sessions_stmt(
+    user_id: uuid.UUID,
+    *,
+    device_id: str | None = None,
+    jwt_id: str | None = None,
+) -> Update:
+    """撤銷符合條件且尚未撤銷的 session，RETURNING (jwt_id, issued_at) 供更新本機過濾器"""
+    stmt = update(ActiveSession).where(ActiveSession.user_id == user_id, ActiveSession.revoked.is_(False))
+    if device_id is not None:
+        stmt = stmt.where(ActiveSession.device_id == device_id)
+    if jwt_id is not None:
+        stmt = stmt.where(ActiveSession.jwt_id == jwt_id)
+    return (
+        stmt.values(revoked=True, revoked_at=datetime.now(tz=timezone.utc))
+        .returning(ActiveSession.jwt_id, ActiveSession.issued_at)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import re
+import tempfile
+from collections.abc import Collection
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import anyio.to_thread
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# multipart 邊界、標頭與其他小欄位的額外容許量
+MULTIPART_OVERHEAD = 16 * 1024
+URL_PREFIX = "/uploads/"
+HEX_PREFIX = re.compile(r"^[0-9a-f]{4}")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidUpload(Exception):
+    pass
+
+
+@dataclass
+class StagedUpload:
+    """已完整寫入暫存檔、尚未放到正式位置的上傳檔案"""
+
+    path: pathlib.Path
+    size: int
+    sha256: str
+    original_filename: str | None
+    content_type: str | None
+
+
+def _open_temp(directory: pathlib.Path) -> tuple[BinaryIO, pathlib.Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=directory, suffix=".part")
+    return os.fdopen(fd, "wb"), pathlib.Path(name)
+
+
+def _write_chunk(handle: BinaryIO, hasher: "hashlib._Hash", data: bytes) -> None:
+    hasher.update(data)
+    handle.write(data)
+
+
+def _close(handle: BinaryIO, *, sync: bool) -> None:
+    if sync:
+        handle.flush()
+        os.fsync(handle.fileno())
+    handle.close()
+
+
+def _unlink(path: pathlib.Path) -> None:
+    path.unlink(missing_ok=True)
+
+
+def _replace(source: pathlib.Path, target: pathlib.Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(source, target)
+
+
+class LocalStorage:
+    """上傳檔案的本機儲存：串流寫入暫存檔、邊寫邊算 SHA-256，完成後以 os.replace 原子地放到正式位置。
+
+    檔案 IO 全部丟到 worker thread，不阻塞事件迴圈。暫存目錄位於 root 之下以確保 rename 不跨檔案系統。
+    檔案以 ``ab/cd/<name>`` 兩層目錄分散存放（key），避免單一目錄有數十萬個檔案；
+    早期平放在 root 下的檔案由 app/scripts/shard_uploads.py 搬移，搬移期間舊的平面路徑仍可讀取。
+    """
+
+    def __init__(self, root: pathlib.Path, *, chunk_size: int) -> None:
+        self.root = root
+        self.tmp_dir = root / ".incoming"
+        self.chunk_size = chunk_size
+
+    def key_for(self, name: str) -> str:
+        """檔名對應的分層 key；雜湊檔名直接取前四個字元，其他檔名取其 SHA-256 的前四個字元"""
+        digest = name if HEX_PREFIX.match(name) else hashlib.sha256(name.encode()).hexdigest()
+        return f"{digest[:2]}/{digest[2:4]}/{name}"
+
+    def legacy_key(self, key: str) -> str | None:
+        """平面路徑（舊版配置）對應的分層 key；已是分層路徑時回傳 None"""
+        if not key or "/" in key:
+            return None
+        return self.key_for(key)
+
+    def path_for(self, filename: str) -> pathlib.Path:
+        return self.root / filename
+
+    def url_for(self, filename: str) -> str:
+        return f"{URL_PREFIX}{filename}"
+
+    def url_aliases(self, url: str) -> set[str]:
+        """同一個檔案在搬移前後的 URL（平面與分層），用來比對內容中尚未改寫的舊引用"""
+        aliases = {url}
+        if url.startswith(URL_PREFIX):
+            key = url[len(URL_PREFIX):]
+            sharded = self.legacy_key(key)
+            if sharded is not None:
+                aliases.add(self.url_for(sharded))
+            else:
+                name = key.rsplit("/", 1)[-1]
+                if self.key_for(name) == key:
+                    aliases.add(self.url_for(name))
+        return aliases
+
+    async def receive(
+        self,
+        request: Request,
+        *,
+        field: str,
+        max_bytes: int,
+        allowed_content_types: Collection[str] | None = None,
+    ) -> StagedUpload:
+        """逐塊解析 multipart 請求並寫入暫存檔；超過 max_bytes 立即中止，不必讀完整個請求"""
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise InvalidUpload("Expected multipart/form-data")
+        declared = request.headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > max_bytes + MULTIPART_OVERHEAD:
+            raise UploadTooLarge
+
+        events: list[tuple[str, bytes]] = []
+
+        def _data_callback(kind: str):
+            def callback(data: bytes, start: int, end: int) -> None:
+                events.append((kind, data[start:end]))
+
+            return callback
+
+        def _notify_callback(kind: str):
+            def callback() -> None:
+                events.append((kind, b""))
+
+            return callback
+
+        parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": _notify_callback("part_begin"),
+                "on_header_field": _data_callback("header_field"),
+                "on_header_value": _data_callback("header_value"),
+                "on_header_end": _notify_callback("header_end"),
+                "on_headers_finished": _notify_callback("headers_finished"),
+                "on_part_data": _data_callback("part_data"),
+                "on_part_end": _notify_callback("part_end"),
+            },
+        )
+
+        handle: BinaryIO | None = None
+        temp_path: pathlib.Path | None = None
+        hasher = hashlib.sha256()
+        buffer = bytearray()
+        size = 0
+        received = 0
+        in_target = False
+        done = False
+        headers: dict[bytes, bytes] = {}
+        header_field = b""
+        header_value = b""
+        original_filename: str | None = None
+        part_content_type: str | None = None
+
+        try:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > max_bytes + MULTIPART_OVERHEAD:
+                    raise UploadTooLarge
+                parser.write(chunk)
+                for kind, data in events:
+                    if kind == "part_begin":
+                        headers, header_field, header_value = {}, b"", b""
+                    elif kind == "header_field":
+                        header_field += data
+                    elif kind == "header_value":
+                        header_value += data
+                    elif kind == "header_end":
+                        headers[header_field.lower()] = header_value
+                        header_field, header_value = b"", b""
+                    elif kind == "headers_finished":
+                        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+                        in_target = not done and options.get(b"name") == field.encode()
+                        if in_target:
+                            filename = options.get(b"filename")
+                            original_filename = filename.decode("utf-8", "replace") if filename else None
+                            raw_type = headers.get(b"content-type")
+                            part_content_type = raw_type.decode("latin-1").strip() if raw_type else None
+                            if allowed_content_types is not None and part_content_type not in allowed_content_types:
+                                raise InvalidUpload("Unsupported file type")
+                            handle, temp_path = await anyio.to_thread.run_sync(_open_temp, self.tmp_dir)
+                    elif kind == "part_data" and in_target:
+                        size += len(data)
+                        if size > max_bytes:
+                            raise UploadTooLarge
+                        buffer += data
+                        if len(buffer) >= self.chunk_size:
+                            await anyio.to_thread.run_sync(_write_chunk, handle, hasher, bytes(buffer))
+                            buffer.clear()
+                    elif kind == "part_end" and in_target:
+                        if buffer:
+                            await anyio.to_thread.run_sync(_write_chunk, handle, hasher, bytes(buffer))
+                            buffer.clear()
+                        in_target = False
+                        done = True
+                events.clear()
+            parser.finalize()
+
+            if not done or handle is None or temp_path is None:
+                raise InvalidUpload("Missing file")
+            await anyio.to_thread.run_sync(lambda: _close(handle, sync=True))
+            handle = None
+        except BaseException:
+            if handle is not None:
+                await anyio.to_thread.run_sync(lambda: _close(handle, sync=False))
+            if temp_path is not None:
+                await anyio.to_thread.run_sync(_unlink, temp_path)
+            raise
+
+        return StagedUpload(
+            path=temp_path,
+            size=size,
+            sha256=hasher.hexdigest(),
+            original_filename=original_filename,
+            content_type=part_content_type,
+        )
+
+    async def commit(self, staged: StagedUpload, filename: str) -> str:
+        """把暫存檔原子地移到正式位置，回傳對外 URL"""
+        await anyio.to_thread.run_sync(_replace, staged.path, self.path_for(filename))
+        return self.url_for(filename)
+
+    async def exists(self, filename: str) -> bool:
+        return await anyio.to_thread.run_sync(self.path_for(filename).exists)
+
+    async def discard(self, staged: StagedUpload) -> None:
+        await anyio.to_thread.run_sync(_unlink, staged.path)
+
+    def delete(self, filename: str) -> None:
+        try:
+            self.path_for(filename).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+storage = LocalStorage(pathlib.Path(settings.upload_dir), chunk_size=settings.upload_chunk_size)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import html
+import re
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+EXCERPT_LENGTH = 200
+
+
+def html_to_text(value: str) -> str:
+    text = TAG_PATTERN.sub(" ", value)
+    return WHITESPACE_PATTERN.sub(" ", html.unescape(text)).strip()
+
+
+def make_excerpt(value: str | None, length: int = EXCERPT_LENGTH) -> str | None:
+    if not value:
+        return None
+    text = html_to_text(value)
+    if len(text) <= length:
+        return text or None
+    return text[:length].rstrip() + "…"
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import math
+
+# 2^12 個暫存器（4 KB），標準誤差約 1.04 / sqrt(4096) ≈ 1.6%
+DEFAULT_PRECISION = 12
+
+
+def _alpha(m: int) -> float:
+    if m == 16:
+        return 0.673
+    if m == 32:
+        return 0.697
+    if m == 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / m)
+
+
+class HyperLogLog:
+    """估計不重複元素數量的 HyperLogLog 草圖；暫存器可序列化成 bytes 存入資料庫並合併"""
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: bytes | bytearray | None = None) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        size = 1 << precision
+        if registers is not None and len(registers) != size:
+            raise ValueError("register size does not match precision")
+        self.precision = precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(size)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> HyperLogLog:
+        precision = len(data).bit_length() - 1
+        if len(data) != 1 << precision:
+            raise ValueError("invalid HyperLogLog registers")
+        return cls(precision, data)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    def add(self, value: str | bytes) -> None:
+        if isinstance(value, str):
+            value = value.encode()
+        hashed = int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: HyperLogLog) -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = _alpha(m) * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        # 小基數時改用 linear counting 修正偏差
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
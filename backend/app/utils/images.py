@@ -0,0 +1,108 @@
+"""圖片衍生檔的產生（在獨立 process 中執行，只依賴 Pillow）"""
+from __future__ import annotations
+
+import base64
+import io
+import os
+import pathlib
+import tempfile
+from typing import Any
+
+from PIL import Image, ImageOps, features
+
+# 依寬度產生的衍生尺寸；原圖不比目標寬時不產生（不放大）
+VARIANT_WIDTHS = {"thumb": 320, "medium": 768, "large": 1600}
+LQIP_WIDTH = 16
+
+EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg", "png": "png"}
+PILLOW_FORMATS = {"avif": "AVIF", "webp": "WEBP", "jpeg": "JPEG", "png": "PNG"}
+MEDIA_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+SAVE_OPTIONS: dict[str, dict[str, Any]] = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 80, "method": 4},
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+    "png": {"optimize": True},
+}
+
+
+class ImageTooLarge(Exception):
+    """宣告的像素數超過上限：不解碼，避免在 worker 中配置數百 MB 的記憶體"""
+
+    def __init__(self, width: int, height: int) -> None:
+        super().__init__(width, height)
+        self.width = width
+        self.height = height
+
+
+def underivable(width: int, height: int) -> dict[str, Any]:
+    """無法產生衍生檔的圖片：只記錄尺寸，不產生 LQIP 與衍生檔，之後也不再重試（一律使用原檔）"""
+    return {"width": width, "height": height, "lqip": None, "variants": {}}
+
+
+def modern_formats() -> list[str]:
+    """此環境的 Pillow 能輸出的新式格式，依偏好排序"""
+    return [fmt for fmt in ("avif", "webp") if features.check(fmt)]
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+
+def _save(image: Image.Image, fmt: str, path: pathlib.Path) -> int:
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            image.save(handle, PILLOW_FORMATS[fmt], **SAVE_OPTIONS[fmt])
+        os.replace(temp_name, path)
+    except BaseException:
+        pathlib.Path(temp_name).unlink(missing_ok=True)
+        raise
+    return path.stat().st_size
+
+
+def _lqip(image: Image.Image) -> str:
+    """極小的模糊預覽圖（data URI），在正式圖片載入前當作占位"""
+    preview = image.copy()
+    preview.thumbnail((LQIP_WIDTH, LQIP_WIDTH * 4))
+    fmt = "webp" if features.check("webp") else "jpeg"
+    if fmt == "jpeg":
+        preview = preview.convert("RGB")
+    buffer = io.BytesIO()
+    preview.save(buffer, PILLOW_FORMATS[fmt], quality=30)
+    return f"data:{MEDIA_TYPES[fmt]};base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+
+def render_derivatives(source: str, output_dir: str, stem: str, *, max_pixels: int) -> dict[str, Any]:
+    """讀取原圖，回傳尺寸、LQIP 與各衍生檔資訊：
+
+    ``{"width", "height", "lqip", "variants": {name: {"width", "height", "formats": {fmt: filename}}}}``
+
+    Image.open 只讀取標頭；宣告的像素數超過 max_pixels 時在解碼前丟出 ImageTooLarge
+    （檔案很小也可能宣告極大的尺寸，Pillow 自身的上限約 1.79 億像素，遠高於 worker 能負擔的記憶體）。
+    """
+    directory = pathlib.Path(output_dir)
+    with Image.open(source) as opened:
+        if opened.width * opened.height > max_pixels:
+            raise ImageTooLarge(opened.width, opened.height)
+        animated = getattr(opened, "is_animated", False)
+        image = ImageOps.exif_transpose(opened)
+        alpha = _has_alpha(image)
+        image = image.convert("RGBA" if alpha else "RGB")
+    width, height = image.size
+    result: dict[str, Any] = {"width": width, "height": height, "lqip": _lqip(image), "variants": {}}
+    if animated:
+        # 動態 GIF 直接使用原檔，避免只留下第一格
+        return result
+
+    formats = [*modern_formats(), "png" if alpha else "jpeg"]
+    for name, target in VARIANT_WIDTHS.items():
+        if target >= width:
+            continue
+        resized = image.resize((target, max(1, round(height * target / width))), Image.Resampling.LANCZOS)
+        variant: dict[str, Any] = {"width": resized.width, "height": resized.height, "formats": {}}
+        for fmt in formats:
+            filename = f"{stem}_{name}.{EXTENSIONS[fmt]}"
+            _save(resized if fmt != "jpeg" else resized.convert("RGB"), fmt, directory / filename)
+            variant["formats"][fmt] = filename
+        result["variants"][name] = variant
+    return result
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import ColumnElement, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """把排序鍵編碼為不透明的 cursor 字串"""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else str(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str, size: int) -> list[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def decode_created_cursor(cursor: str, id_type: type = int) -> tuple[datetime, Any]:
+    created_at, item_id = _decode(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), id_type(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
+
+
+def decode_id_cursor(cursor: str) -> uuid.UUID:
+    (item_id,) = _decode(cursor, 1)
+    try:
+        return uuid.UUID(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
+
+
+def created_before(created_column: Any, id_column: Any, cursor: tuple[datetime, Any]) -> ColumnElement:
+    """(created_at, id) 由新到舊排序時，取 cursor 之後的資料列（row comparison 可直接走複合索引）"""
+    return tuple_(created_column, id_column) < tuple_(*cursor)
+
+
+def set_next_cursor(response: Response, items: list, limit: int, *key_attrs: str) -> None:
+    """回傳筆數等於 limit 時，以最後一筆的排序鍵產生下一頁 cursor"""
+    if items and len(items) == limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*(getattr(last, attr) for attr in key_attrs))
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import get_settings
+from app.utils.cache import TTLCache
+
+_settings = get_settings()
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=_settings.bcrypt_rounds)
+
+# 已驗證的 token payload，以 token 摘要為 key，存活到 token 自身的 exp 為止
+_decoded_tokens: TTLCache[bytes, dict] = TTLCache(
+    max_size=_settings.jwt_decode_cache_max_size,
+    ttl=_settings.jwt_expire_minutes * 60,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -16,17 +28,43 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(*, subject: str, token_version: int, secret_key: str, algorithm: str, expires_minutes: int) -> tuple[str, datetime]:
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """驗證密碼；若既有 hash 的 cost 已過時，一併回傳重新計算的 hash"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def create_access_token(
+    *, subject: str, token_version: int, jwt_id: str, secret_key: str, algorithm: str, expires_minutes: int
+) -> tuple[str, datetime]:
     now = datetime.now(tz=timezone.utc)
     expire = now + timedelta(minutes=expires_minutes)
-    payload = {"sub": subject, "token_version": token_version, "iat": int(now.timestamp()), "exp": int(expire.timestamp())}
+    payload = {
+        "sub": subject,
+        "token_version": token_version,
+        "jti": jwt_id,
+        "iat": int(now.timestamp()),
+        "exp": int(expire.timestamp()),
+    }
     encoded_jwt = jwt.encode(payload, secret_key, algorithm=algorithm)
     return encoded_jwt, expire
 
 
+def _token_digest(token: str, secret_key: str, algorithm: str) -> bytes:
+    return hashlib.sha256(f"{algorithm}\0{secret_key}\0{token}".encode()).digest()
+
+
 def decode_access_token(token: str, secret_key: str, algorithm: str) -> dict:
+    key = _token_digest(token, secret_key, algorithm)
+    cached = _decoded_tokens.get(key)
+    if cached is not None and cached["exp"] > time.time():
+        return dict(cached)
+
     try:
         payload = jwt.decode(token, secret_key, algorithms=[algorithm])
     except JWTError as exc:  # pragma: no cover - simple re-raise
         raise ValueError("Invalid token") from exc
-    return payload
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _decoded_tokens.set(key, payload, ttl=exp - time.time())
+    return dict(payload)
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import os
+import re
+import stat
+from collections.abc import Callable
+from email.utils import formatdate, parsedate
+from mimetypes import guess_type
+from typing import BinaryIO
+from urllib.parse import quote
+
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Receive, Scope, Send
+
+# 內容定址的原檔名：<sha256>.<ext>，檔名即內容雜湊
+HASHED_NAME = re.compile(r"^[0-9a-f]{64}$")
+# 值得查找預先壓縮版本（.br / .gz）的類型；圖片本身已壓縮，不需要
+COMPRESSIBLE_TYPES = ("text/", "image/svg+xml", "application/json", "application/javascript", "application/xml")
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(value: str, size: int) -> tuple[int, int] | None:
+    """解析單一 bytes range，回傳含頭尾的 (start, end)；多段或格式錯誤時回傳 None（改回完整內容）"""
+    unit, _, spec = value.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # bytes=-N：最後 N 個 bytes
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def _accepted_encodings(value: str) -> set[str]:
+    accepted = set()
+    for item in value.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _strip_encoding(tag: str) -> str:
+    for encoding, _ in PRECOMPRESSED:
+        if tag.endswith(f'-{encoding}"'):
+            return tag[: -len(encoding) - 2] + '"'
+    return tag
+
+
+def _open(path: str) -> BinaryIO:
+    return open(path, "rb")
+
+
+def _read_at(handle: BinaryIO, offset: int, size: int) -> bytes:
+    return os.pread(handle.fileno(), size, offset)
+
+
+class MediaFileResponse(Response):
+    """回傳檔案（或其中一段）。ASGI server 支援 zerocopysend / pathsend 擴充時交給 server 以 sendfile 傳送，
+    否則在 worker thread 以 pread 分塊讀取。"""
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        offset: int,
+        count: int,
+        whole_file: bool,
+        status_code: int,
+        headers: dict[str, str],
+        media_type: str,
+    ) -> None:
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.whole_file = whole_file
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers({**headers, "content-length": str(count)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if self.whole_file and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+            return
+
+        handle = await anyio.to_thread.run_sync(_open, self.path)
+        try:
+            if "http.response.zerocopysend" in extensions:
+                await send(
+                    {"type": "http.response.zerocopysend", "file": handle, "offset": self.offset, "count": self.count}
+                )
+                return
+            position, remaining = self.offset, self.count
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(_read_at, handle, position, min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                position += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # 傳送途中檔案被截斷：結束回應，讓 client 依 Content-Length 判斷不完整
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await anyio.to_thread.run_sync(handle.close)
+
+
+class MediaStaticFiles(StaticFiles):
+    """/uploads 的檔案服務。
+
+    - 檔名為內容雜湊或隨機值且不重複使用，一律回傳長效 ``immutable`` 快取標頭
+    - 強 ETag：內容定址的原檔直接使用 SHA-256，其餘檔案以大小與修改時間組成
+    - 支援 If-None-Match / If-Modified-Since（304）與單段 Range / If-Range（206 / 416）
+    - 可壓縮類型若存在 ``.br`` / ``.gz`` 預壓縮檔則依 Accept-Encoding 直接回傳
+    - 設定 accel_redirect_prefix 時只回傳 X-Accel-Redirect 標頭，由前端的 nginx 傳送檔案內容
+    - 不提供以 ``.`` 開頭的路徑（例如上傳暫存目錄 ``.incoming``）
+    - 找不到檔案時以 legacy_key 換算成新配置的路徑再找一次（目錄配置搬移期間與之後的舊 URL）
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str,
+        max_age: int,
+        accel_redirect_prefix: str = "",
+        legacy_key: Callable[[str], str | None] | None = None,
+    ) -> None:
+        super().__init__(directory=directory)
+        self.cache_control = f"public, max-age={max_age}, immutable"
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip("/")
+        self.legacy_key = legacy_key
+
+    def _lookup(self, path: str) -> tuple[str, str, os.stat_result | None]:
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None and self.legacy_key is not None:
+            fallback = self.legacy_key(path.lstrip("/"))
+            if fallback is not None:
+                full_path, stat_result = self.lookup_path(fallback)
+                path = fallback
+        return path, full_path, stat_result
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        parts = path.replace("\\", "/").split("/")
+        if any(part.startswith(".") for part in parts if part):
+            raise HTTPException(status_code=404)
+
+        try:
+            path, full_path, stat_result = await anyio.to_thread.run_sync(self._lookup, path)
+        except (PermissionError, OSError):
+            raise HTTPException(status_code=404) from None
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            raise HTTPException(status_code=404)
+
+        request_headers = Headers(scope=scope)
+        media_type = guess_type(full_path)[0] or "application/octet-stream"
+        headers = {
+            "cache-control": self.cache_control,
+            "etag": self.etag_for(full_path, stat_result),
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "accept-ranges": "bytes",
+        }
+        compressible = media_type.startswith(COMPRESSIBLE_TYPES)
+        if compressible:
+            headers["vary"] = "Accept-Encoding"
+        if self.is_not_modified(headers, request_headers):
+            return Response(status_code=304, headers=_not_modified_headers(headers))
+
+        if self.accel_redirect_prefix:
+            # 交給 nginx 的 internal location 傳送：Range 與 sendfile 都由 nginx 處理
+            headers["x-accel-redirect"] = f"{self.accel_redirect_prefix}/{quote(path.lstrip('/'))}"
+            return Response(status_code=200, headers=headers, media_type=media_type)
+
+        if compressible:
+            encoded = await self._precompressed(full_path, request_headers)
+            if encoded is not None:
+                encoding, encoded_path, encoded_stat = encoded
+                headers["content-encoding"] = encoding
+                headers["etag"] = f'{headers["etag"][:-1]}-{encoding}"'
+                return MediaFileResponse(
+                    encoded_path,
+                    offset=0,
+                    count=encoded_stat.st_size,
+                    whole_file=True,
+                    status_code=200,
+                    headers=headers,
+                    media_type=media_type,
+                )
+
+        size = stat_result.st_size
+        byte_range = None
+        range_header = request_headers.get("range")
+        if range_header and self._if_range_matches(headers, request_headers):
+            try:
+                byte_range = parse_range(range_header, size)
+            except RangeNotSatisfiable:
+                return Response(
+                    status_code=416,
+                    headers={**_not_modified_headers(headers), "content-range": f"bytes */{size}"},
+                )
+        if byte_range is None:
+            return MediaFileResponse(
+                full_path,
+                offset=0,
+                count=size,
+                whole_file=True,
+                status_code=200,
+                headers=headers,
+                media_type=media_type,
+            )
+        start, end = byte_range
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+        return MediaFileResponse(
+            full_path,
+            offset=start,
+            count=end - start + 1,
+            whole_file=start == 0 and end == size - 1,
+            status_code=206,
+            headers=headers,
+            media_type=media_type,
+        )
+
+    @staticmethod
+    def etag_for(full_path: str, stat_result: os.stat_result) -> str:
+        stem = os.path.splitext(os.path.basename(full_path))[0]
+        if HASHED_NAME.match(stem):
+            return f'"{stem}"'
+        return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+    def is_not_modified(self, response_headers: dict[str, str], request_headers: Headers) -> bool:  # type: ignore[override]
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            # 有 If-None-Match 時忽略 If-Modified-Since（RFC 9110 13.1.3）
+            # 預壓縮版本的 ETag 帶有 -br / -gzip 後綴，同一份原檔都視為相符
+            etag = response_headers["etag"]
+            tags = [_strip_encoding(tag.strip().removeprefix("W/")) for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since is not None:
+            since = parsedate(if_modified_since)
+            last_modified = parsedate(response_headers["last-modified"])
+            return since is not None and last_modified is not None and since >= last_modified
+        return False
+
+    @staticmethod
+    def _if_range_matches(response_headers: dict[str, str], request_headers: Headers) -> bool:
+        if_range = request_headers.get("if-range")
+        if if_range is None:
+            return True
+        if if_range.startswith(('"', "W/")):
+            return if_range == response_headers["etag"]
+        return if_range == response_headers["last-modified"]
+
+    async def _precompressed(
+        self, full_path: str, request_headers: Headers
+    ) -> tuple[str, str, os.stat_result] | None:
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            try:
+                encoded_stat = await anyio.to_thread.run_sync(os.stat, full_path + suffix)
+            except OSError:
+                continue
+            if stat.S_ISREG(encoded_stat.st_mode):
+                return encoding, full_path + suffix, encoded_stat
+        return None
+
+
+def _not_modified_headers(headers: dict[str, str]) -> dict[str, str]:
+    return {key: value for key, value in headers.items() if key in ("cache-control", "etag", "last-modified", "vary")}
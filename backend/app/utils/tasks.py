@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(interval: float, func: Callable[[], Awaitable[object]], *, name: str) -> None:
+    """立即執行一次 func，之後每隔 interval 秒重複；單次失敗只記錄 log，不中斷迴圈"""
+    while True:
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background task %s failed", name)
+        await asyncio.sleep(interval)
@@ -0,0 +1,68 @@
+"""比較內容列表完整輸出（ContentOut，含 body）與摘要投影（ContentSummaryOut）的回應大小與序列化耗時
+
+    cd backend && python -m benchmarks.bench_content_list_payload
+"""
+from __future__ import annotations
+
+import timeit
+import uuid
+from datetime import datetime, timezone
+
+from pydantic import TypeAdapter
+
+from app.models.content import ContentStatus
+from app.schemas.content import ContentOut, ContentSummaryOut
+from app.utils.html import make_excerpt
+
+ITEMS = 100
+BODY_BYTES = 20_000
+ROUNDS = 200
+
+
+def _rows() -> list[dict]:
+    body = ("<p>段落內容 paragraph text with <a href='/uploads/x.png'>link</a></p>" * 400)[:BODY_BYTES]
+    now = datetime.now(tz=timezone.utc)
+    return [
+        {
+            "id": index,
+            "title": f"文章標題 {index}",
+            "slug": f"article-{index}",
+            "category_id": 1,
+            "body": body,
+            "status": ContentStatus.PUBLISHED,
+            "meta_title": None,
+            "meta_description": None,
+            "cover_image_url": "/uploads/cover.png",
+            "tags": "news,product",
+            "excerpt": make_excerpt(body),
+            "author_id": uuid.uuid4(),
+            "created_at": now,
+            "updated_at": now,
+            "is_deleted": False,
+        }
+        for index in range(ITEMS)
+    ]
+
+
+def main() -> None:
+    rows = _rows()
+    full_adapter = TypeAdapter(list[ContentOut])
+    summary_adapter = TypeAdapter(list[ContentSummaryOut])
+    full_items = full_adapter.validate_python(rows)
+    summary_items = summary_adapter.validate_python(rows)
+
+    full_bytes = len(full_adapter.dump_json(full_items))
+    summary_bytes = len(summary_adapter.dump_json(summary_items))
+    full_time = timeit.timeit(lambda: full_adapter.dump_json(full_adapter.validate_python(rows)), number=ROUNDS)
+    summary_time = timeit.timeit(
+        lambda: summary_adapter.dump_json(summary_adapter.validate_python(rows)), number=ROUNDS
+    )
+
+    print(f"items per page        : {ITEMS} (body {BODY_BYTES} bytes each)")
+    print(f"full payload          : {full_bytes:>10,} bytes  {full_time / ROUNDS * 1e3:8.3f} ms/page")
+    print(f"summary payload       : {summary_bytes:>10,} bytes  {summary_time / ROUNDS * 1e3:8.3f} ms/page")
+    print(f"reduction             : {full_bytes / summary_bytes:8.1f}x bytes, {full_time / summary_time:5.1f}x time")
+
+
+if __name__ == "__main__":
+    main()
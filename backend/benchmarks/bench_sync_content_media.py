@@ -0,0 +1,96 @@
+"""比較舊版「全刪全插」與增量 sync_content_media 在引用數百張圖片時的 SQL 敘述數與寫入列數
+
+    cd backend && python -m benchmarks.bench_sync_content_media
+
+以 SQLite 記憶體資料庫量測；寫入列數（DELETE + INSERT 影響的列）可視為 PostgreSQL WAL 量的近似指標。
+"""
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import Callable
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.media_file import ContentMedia, MediaFile
+from app.services.content_media import IMAGE_PATTERN, sync_content_media
+
+IMAGES = 300
+CONTENT_ID = 1
+
+
+def legacy_sync_content_media(db: Session, content_id: int, html: str | None) -> None:
+    db.query(ContentMedia).filter(ContentMedia.content_id == content_id).delete(synchronize_session=False)
+    if not html:
+        return
+    urls = {match.group(1) for match in IMAGE_PATTERN.finditer(html)}
+    if not urls:
+        return
+    media_items = db.query(MediaFile).filter(MediaFile.url.in_(urls)).all()
+    for media in media_items:
+        db.add(ContentMedia(content_id=content_id, media_id=media.id))
+
+
+def _body(count: int, offset: int = 0) -> str:
+    return "".join(f'<p><img src="/uploads/{index}.png"></p>' for index in range(offset, offset + count))
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.rows_written = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001
+        self.statements += 1
+        if statement.lstrip().upper().startswith(("INSERT", "DELETE")):
+            self.rows_written += max(cursor.rowcount, 0)
+
+
+def _run(sync: Callable[[Session, int, str | None], None], bodies: list[str]) -> tuple[int, int, float]:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[MediaFile.__table__, ContentMedia.__table__])
+    with Session(engine) as db:
+        db.add_all(
+            MediaFile(
+                id=uuid.uuid4(),
+                filename=f"{index}.png",
+                url=f"/uploads/{index}.png",
+                content_type="image/png",
+                size=1,
+            )
+            for index in range(IMAGES + 10)
+        )
+        db.commit()
+        sync(db, CONTENT_ID, bodies[0])
+        db.commit()
+
+        counter = StatementCounter()
+        event.listen(engine, "after_cursor_execute", counter)
+        started = time.perf_counter()
+        for body in bodies[1:]:
+            sync(db, CONTENT_ID, body)
+            db.commit()
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "after_cursor_execute", counter)
+    engine.dispose()
+    return counter.statements, counter.rows_written, elapsed
+
+
+def main() -> None:
+    scenarios = {
+        "unchanged body": [_body(IMAGES)] * 11,
+        "one image added": [_body(IMAGES + index) for index in range(11)],
+        "one image swapped": [_body(IMAGES, offset=index) for index in range(11)],
+    }
+    print(f"{IMAGES} images per body, 10 updates per scenario")
+    for name, bodies in scenarios.items():
+        for label, sync in (("legacy", legacy_sync_content_media), ("incremental", sync_content_media)):
+            statements, rows, elapsed = _run(sync, bodies)
+            print(f"{name:<18} {label:<12}: {statements:>6} statements  {rows:>6} rows written  {elapsed * 1e3:8.2f} ms")
+    print("route also skips sync entirely when the update changes neither body nor is_deleted")
+
+
+if __name__ == "__main__":
+    main()
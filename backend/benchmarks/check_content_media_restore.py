@@ -0,0 +1,56 @@
+"""確認內容封存後還原（body 未變動）會重新連結媒體並恢復 usage_count
+
+    cd backend && python -m benchmarks.check_content_media_restore
+
+以 SQLite 記憶體資料庫執行，呼叫與 update_content / delete_content 相同的同步函式。
+"""
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.media_file import ContentMedia, MediaFile
+from app.services.content_media import find_usage_drift, sync_content_media_state
+
+CONTENT_ID = 1
+BODY = '<p><img src="/uploads/a.png"><img src="/uploads/b.png"></p>'
+
+
+def _state(db: Session) -> tuple[int, list[int]]:
+    links = db.scalar(select(func.count(ContentMedia.id)).where(ContentMedia.content_id == CONTENT_ID))
+    counts = list(db.scalars(select(MediaFile.usage_count).order_by(MediaFile.filename)))
+    return links, counts
+
+
+def main() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[MediaFile.__table__, ContentMedia.__table__])
+    failures = 0
+    with Session(engine) as db:
+        db.add_all(
+            MediaFile(id=uuid.uuid4(), filename=name, url=f"/uploads/{name}", content_type="image/png", size=1)
+            for name in ("a.png", "b.png")
+        )
+        db.commit()
+        steps = (
+            ("create", False, (2, [1, 1])),
+            ("delete", True, (0, [0, 0])),
+            ("restore", False, (2, [1, 1])),
+        )
+        for name, is_deleted, expected in steps:
+            sync_content_media_state(db, CONTENT_ID, BODY, is_deleted=is_deleted)
+            db.commit()
+            state = _state(db)
+            ok = state == expected and not find_usage_drift(db)
+            failures += not ok
+            print(f"{'ok' if ok else 'FAIL':<4} {name:<8}: links={state[0]} usage_count={state[1]} expected={expected}")
+    engine.dispose()
+    if failures:
+        raise SystemExit(f"{failures} step(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""確認內容搜尋能以詞中的片段找到中文標題，英文仍走 tsvector 前綴比對
+
+    cd backend && python -m benchmarks.check_content_search
+
+需要 PostgreSQL（DATABASE_URL）；測試資料寫在單一交易中，結束時 rollback，不會留下資料。
+"""
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.models.content import Content
+from app.services.content_search import search_condition
+
+TITLE = "會員內容管理系統教學"
+CASES = {
+    "內容管理": True,  # 標題中段的中文片段
+    "內容": True,  # 兩個字（pg_trgm 無法以索引處理的長度）
+    "理": True,  # 單一個字
+    "容內": False,  # 字都存在但順序不同
+    "系統 教學": True,  # 多個中文詞都需命中
+    "管理 不存在": False,
+    "membership": True,  # 英文以 tsvector 前綴比對 slug
+    "member": True,
+    "nothing": False,
+}
+
+
+def main() -> None:
+    marker = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        content = Content(title=TITLE, slug=f"membership-guide-{marker}", body="<p>內文</p>")
+        db.add(content)
+        db.flush()
+        failures = 0
+        for search, expected in CASES.items():
+            condition, _ = search_condition(search)
+            found = condition is not None and db.scalar(
+                select(Content.id).where(Content.id == content.id, condition)
+            ) is not None
+            status = "ok" if found == expected else "FAIL"
+            failures += found != expected
+            print(f"{status:<4} {search!r}: found={found} expected={expected}")
+        db.rollback()
+    if failures:
+        raise SystemExit(f"{failures} search case(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import { createRouter, createWebHistory } from 'vue-router'
 import { useAuthStore } from '../store/auth'
 import { pinia } from '../store'
+import api from '../services/api'
 
 import HomePage from '../pages/HomePage.vue'
 import CategoryPage from '../pages/CategoryPage.vue'
@@ -21,11 +22,31 @@ const routes = [
     meta: { requiresAuth: false }
   },
   {
-    path: '/article/:id',
+    path: '/article/:slug',
     name: 'article',
     component: ArticlePage,
     meta: { requiresAuth: true } // 文章內容頁需要登入
   },
+  {
+    // 舊版以 id 為網址的文章連結：換成 slug 網址；查無此 id 時當作 slug 處理（純數字 slug）
+    path: '/article/:id(\\d+)',
+    name: 'article-by-id',
+    component: ArticlePage,
+    meta: { requiresAuth: true },
+    beforeEnter: async (to) => {
+      try {
+        const { data } = await api.get(`/api/public/contents/by-id/${to.params.id}`)
+        if (data.slug !== to.params.id && !/^\d+$/.test(data.slug)) {
+          return { name: 'article', params: { slug: data.slug }, query: to.query, hash: to.hash, replace: true }
+        }
+      } catch (error) {
+        if (error.response?.status !== 404) {
+          console.error('Failed to resolve article id:', error)
+        }
+      }
+      return true
+    }
+  },
   {
     path: '/login',
     name: 'login',
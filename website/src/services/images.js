@@ -0,0 +1,13 @@
+import api from './api'
+
+// 本站上傳的圖片改走 /api/media/image，由後端依寬度與瀏覽器支援的格式（AVIF/WebP）轉址到合適的衍生檔
+export const imageUrl = (src, width) => {
+  if (!src || !src.startsWith('/uploads/')) {
+    return src
+  }
+  const params = new URLSearchParams({ src })
+  if (width) {
+    params.set('w', String(Math.round(width * (window.devicePixelRatio || 1))))
+  }
+  return `${api.defaults.baseURL}/api/media/image?${params}`
+}
@@ -0,0 +1,59 @@
+import api from './api'
+
+// 行為事件先暫存在前端，定期整批送到 /api/audit/track/batch
+const FLUSH_INTERVAL_MS = 5000
+const MAX_BUFFERED_EVENTS = 50
+
+let buffer = []
+let timer = null
+
+const send = async (events) => {
+  try {
+    await api.post('/api/audit/track/batch', events)
+  } catch (err) {
+    console.error('Failed to track events:', err)
+  }
+}
+
+export const flush = () => {
+  if (timer) {
+    clearTimeout(timer)
+    timer = null
+  }
+  if (!buffer.length) return Promise.resolve()
+  const events = buffer
+  buffer = []
+  return send(events)
+}
+
+// 頁面關閉或切到背景時，以 keepalive 送出剩餘事件
+const flushOnHide = () => {
+  if (!buffer.length) return
+  const events = buffer
+  buffer = []
+  fetch(`${api.defaults.baseURL}/api/audit/track/batch`, {
+    method: 'POST',
+    keepalive: true,
+    headers: {
+      'Content-Type': 'application/json',
+      Authorization: api.defaults.headers.common.Authorization || ''
+    },
+    body: JSON.stringify(events)
+  }).catch(() => {})
+}
+
+if (typeof window !== 'undefined') {
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushOnHide()
+  })
+  window.addEventListener('pagehide', flushOnHide)
+}
+
+export const track = (action, targetId = null, meta = null) => {
+  buffer.push({ action, target_id: targetId, meta })
+  if (buffer.length >= MAX_BUFFERED_EVENTS) {
+    flush()
+  } else if (!timer) {
+    timer = setTimeout(flush, FLUSH_INTERVAL_MS)
+  }
+}